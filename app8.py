@@ -1,7 +1,7 @@
 import pygame
 import pygame_gui
 import numpy as np
-from collections import defaultdict
+from functools import lru_cache
 
 # Constants
 WINDOW_WIDTH = 1024
@@ -13,11 +13,23 @@ VEHICLE_LENGTH = 40
 VEHICLE_WIDTH = 20
 LIGHT_RADIUS = 8
 
+# Simulation runs in fixed steps, decoupled from the render frame rate
+SIMULATION_HZ = 60
+SIMULATION_DT = 1 / SIMULATION_HZ
+CONTROL_HZ = 10  # Rate of the density / light-decision pass
+CONTROL_INTERVAL = SIMULATION_HZ // CONTROL_HZ  # Simulation steps per control pass
+RENDER_FPS = 60
+MAX_FRAME_TIME = 1 / 30  # Longest frame time fed to the UI and the simulation after a hitch
+
 # Traffic light timing constants
 MIN_GREEN_TIME = 10
 MAX_GREEN_TIME = 30
 YELLOW_TIME = 3
 
+# Traffic light states
+RED, GREEN, YELLOW = 0, 1, 2
+LIGHT_STATE_NAMES = ('red', 'green', 'yellow')  # Indexed by state, for display
+
 # Junction sides configuration
 JUNCTION_SIDES = {
     'N': {'position_offset': (0, -1), 'lanes': 2},
@@ -26,6 +38,14 @@ JUNCTION_SIDES = {
     'W': {'position_offset': (-1, 0), 'lanes': 2}
 }
 
+# Side label offsets from a junction's centre, shared by every junction
+_SIDE_OFFSETS = (
+    (0, -INTERSECTION_SIZE//2 - 20, 'North'),
+    (0, INTERSECTION_SIZE//2 + 20, 'South'),
+    (INTERSECTION_SIZE//2 + 20, 0, 'East'),
+    (-INTERSECTION_SIZE//2 - 20, 0, 'West')
+)
+
 # Vehicle types with their properties
 VEHICLE_TYPES = {
     'Car': {'length': 40, 'width': 20, 'speed': 3, 'color': (255, 0, 0)},
@@ -34,50 +54,166 @@ VEHICLE_TYPES = {
     'Motorcycle': {'length': 30, 'width': 15, 'speed': 4, 'color': (255, 165, 0)}
 }
 
+# Vehicle type table for the lane arrays: one (length, width, speed) row per type
+VEHICLE_TYPE_NAMES = list(VEHICLE_TYPES.keys())
+VEHICLE_TYPE_IDX = {name: idx for idx, name in enumerate(VEHICLE_TYPE_NAMES)}
+VEHICLE_TABLE = np.array([[props['length'], props['width'], props['speed']]
+                          for props in VEHICLE_TYPES.values()], dtype=np.float32)
+# Integer half length/width per type, for building blit destinations from the lane arrays
+VEHICLE_HALF_SIZE = VEHICLE_TABLE[:, :2].astype(np.int32) // 2
+
+# Lane arrays hold positions as int32 fixed point with 4 sub-pixel bits (1 px == 16 units)
+POS_SHIFT = 4
+
+# Direction lookup tables, indexed by DIR_IDX
+DIR_IDX = {'E': 0, 'W': 1, 'N': 2, 'S': 3}
+_DIR_SIGN = np.array([[1, 0], [-1, 0], [0, -1], [0, 1]], dtype=np.int8)
+# Vehicles are off screen once sign * position along their axis exceeds this bound
+_OFF_SCREEN_BOUND = np.array([WINDOW_WIDTH + 100, 100, 100, WINDOW_HEIGHT + 100], dtype=np.int32) << POS_SHIFT
+
+# Side indices for per-side arrays on Intersection
+E_IDX, W_IDX, N_IDX, S_IDX = 0, 1, 2, 3
+SIDE_IDX = {'E': E_IDX, 'W': W_IDX, 'N': N_IDX, 'S': S_IDX}
+EW_SIDES = (E_IDX, W_IDX)
+NS_SIDES = (N_IDX, S_IDX)
+
+# Side each lane is fed from -> direction its vehicles travel (into the junction)
+SIDE_DIRECTION = {'N': 'S', 'S': 'N', 'E': 'W', 'W': 'E'}
+
+# Spawn coordinate along the direction of travel for each (side, junction_id)
+SPAWN_TABLE = {
+    ('W', 0): 100,                         # Left edge for Junction 0
+    ('W', 1): WINDOW_WIDTH//3 + 100,       # Middle point for Junction 1
+    ('E', 0): 2*WINDOW_WIDTH//3 - 100,     # Middle point for Junction 0
+    ('E', 1): WINDOW_WIDTH - 100,          # Right edge for Junction 1
+    ('N', 0): 100,                         # Top edge
+    ('N', 1): 100,
+    ('S', 0): WINDOW_HEIGHT - 100,         # Bottom edge
+    ('S', 1): WINDOW_HEIGHT - 100
+}
+
+# Pre-rendered surfaces for batched blitting, filled by load_sprites() once a display exists
+VEHICLE_SPRITE_ROWS = {'H': [], 'V': []}  # One sprite per type index and orientation
+STATIC_SPRITES = {}
+LIGHT_SURFS = {}
+TIMER_DIGITS = {}
+FONTS = {}
+
+def load_sprites():
+    """Pre-render one surface per vehicle type/orientation plus light bodies and lane markers"""
+    # Rows are indexed by type, so a repeated call must start them afresh
+    for sprite_row in VEHICLE_SPRITE_ROWS.values():
+        sprite_row.clear()
+    for vehicle_type, props in VEHICLE_TYPES.items():
+        sizes = {'H': (props['length'], props['width']), 'V': (props['width'], props['length'])}
+        for orientation, size in sizes.items():
+            surface = pygame.Surface(size).convert()
+            surface.fill(props['color'])
+            VEHICLE_SPRITE_ROWS[orientation].append(surface)
+            
+    # One complete traffic light panel (body plus lit/unlit lamps) per state
+    for state in (RED, YELLOW, GREEN):
+        panel = pygame.Surface((20, 60)).convert()
+        panel.fill((50, 50, 50))
+        red_color = (255, 0, 0) if state == RED else (50, 0, 0)
+        yellow_color = (255, 255, 0) if state == YELLOW else (50, 50, 0)
+        green_color = (0, 255, 0) if state == GREEN else (0, 50, 0)
+        pygame.draw.circle(panel, red_color, (10, 10), LIGHT_RADIUS)
+        pygame.draw.circle(panel, yellow_color, (10, 30), LIGHT_RADIUS)
+        pygame.draw.circle(panel, green_color, (10, 50), LIGHT_RADIUS)
+        LIGHT_SURFS[state] = panel
+        
+    FONTS[24] = pygame.font.Font(None, 24)
+    # Countdown texts up to the 45s maximum green time; timer_text() fills in any others
+    for seconds in range(46):
+        timer_text(seconds)
+        
+    lane_marker = pygame.Surface((7, 7), pygame.SRCALPHA).convert_alpha()
+    pygame.draw.circle(lane_marker, (255, 255, 255), (3, 3), 3)
+    STATIC_SPRITES['lane_marker'] = lane_marker
+
+def timer_text(seconds):
+    """Return the countdown text surface, rendering each value only once"""
+    if seconds not in TIMER_DIGITS:
+        TIMER_DIGITS[seconds] = FONTS[24].render(f"{seconds}s", True, (255, 255, 255))
+    return TIMER_DIGITS[seconds]
+
+def step_vehicles(pos_along, step, min_gap):
+    """Advance one lane's vehicles in place by one tick.
+    
+    A vehicle moves only if its path is clear: it keeps its own length plus
+    spacing from the vehicle placed before it. All arrays are int32 fixed point.
+    """
+    can_move = np.empty(pos_along.size, dtype=bool)
+    can_move[0] = True
+    gaps = np.diff(pos_along)
+    np.abs(gaps, out=gaps)
+    np.greater_equal(gaps, min_gap[1:], out=can_move[1:])
+    np.add(pos_along, step, out=pos_along, where=can_move)
+
+
 class Lane:
-    def __init__(self, junction_id, side, lane_number, position):
+    def __init__(self, junction_id, side, lane_number, position, intersection):
         self.junction_id = junction_id
+        self.intersection = intersection  # Owner of the running per-side vehicle counts
         self.side = side
+        self.side_idx = SIDE_IDX[side]
         self.lane_number = lane_number
         self.position = position
-        self.vehicles = []
         self.spacing = 5
         
-        # Get junction centers
-        junction0_y = WINDOW_HEIGHT//2
-        junction1_y = WINDOW_HEIGHT//2
-        junction0_x = WINDOW_WIDTH//3
-        junction1_x = 2*WINDOW_WIDTH//3
-        
-        # Determine direction based on side and lane number
+        # Determine direction based on side
         # For E/W: Lane 1 goes East, Lane 2 goes West
         # For N/S: Lane 1 goes South, Lane 2 goes North
-        if self.side == 'N':
-            self.direction = 'S'  # Vehicles from North move South (into junction)
-        elif self.side == 'S':
-            self.direction = 'N'  # Vehicles from South move North (into junction)
-        elif self.side == 'E':
-            self.direction = 'W'  # Vehicles from East move West
-        else:  # West side
-            self.direction = 'E'  # Vehicles from West move East
-        
-        # Set spawn points based on lane number, side, and junction
-        if side == 'W':  # West side lanes
-            if junction_id == 0:
-                self.spawn_point = [100, position[1]]  # Left edge for Junction 0
-            else:
-                self.spawn_point = [junction0_x + 100, position[1]]  # Middle point for Junction 1
-        elif side == 'E':  # East side lanes
-            if junction_id == 0:
-                self.spawn_point = [junction1_x - 100, position[1]]  # Middle point for Junction 0
-            else:
-                self.spawn_point = [WINDOW_WIDTH - 100, position[1]]  # Right edge for Junction 1
-        elif side == 'N':  # North side lanes
-            if junction_id == 0 or junction_id == 1:
-                self.spawn_point = [position[0], 100]  # Top edge
-        elif side == 'S':  # South side lanes
-            if junction_id == 0 or junction_id == 1:
-                self.spawn_point = [position[0], WINDOW_HEIGHT - 100]  # Bottom edge
+        self.direction = SIDE_DIRECTION[side]
+        self.dir_idx = DIR_IDX[self.direction]
+        
+        # Axis of travel (0 = x, 1 = y) and whether positions grow or shrink along it
+        dx, dy = _DIR_SIGN[self.dir_idx]
+        self.axis = 0 if dx else 1
+        self.sign = int(dx or dy)
+        
+        # Vehicle state kept as parallel arrays in placement order (Structure-of-Arrays):
+        # position along the axis, required gap (own length + spacing) and signed step per
+        # frame, all in POS_SHIFT fixed-point units
+        self._state = {
+            'pos_along': np.empty(0, dtype=np.int32),
+            'min_gap': np.empty(0, dtype=np.int32),
+            'step': np.empty(0, dtype=np.int32)
+        }
+        self.types = np.empty(0, dtype=np.int8)
+        self.vehicle_count = 0  # Length of the arrays above, kept as a plain attribute
+        self._cumulative_offset = 0  # Sum of min_gap over the vehicles in the lane
+        
+        # Spawn point sits on the lane, at the table's coordinate along the direction of travel
+        self.spawn_point = list(position)
+        self.spawn_point[self.axis] = SPAWN_TABLE[(side, junction_id)]
+        
+        # Vehicles leave the screen once sign * pos_along passes this bound
+        self.off_screen_bound = _OFF_SCREEN_BOUND[self.dir_idx]
+        
+    def blit_items(self):
+        """Return (sprite, destination) pairs for every vehicle, computed from the lane arrays"""
+        if self.vehicle_count == 0:
+            return []
+        half_length = VEHICLE_HALF_SIZE[self.types, 0]
+        half_width = VEHICLE_HALF_SIZE[self.types, 1]
+        
+        # Top-left corner: along the axis from the position, across it from the lane line
+        dest = np.empty((self.vehicle_count, 2), dtype=np.int32)
+        dest[:, self.axis] = (self._state['pos_along'] >> POS_SHIFT) - half_length
+        dest[:, 1 - self.axis] = int(self.spawn_point[1 - self.axis]) - half_width
+        
+        sprites = VEHICLE_SPRITE_ROWS['H' if self.axis == 0 else 'V']
+        return [(sprites[type_idx], tuple(topleft))
+                for type_idx, topleft in zip(self.types.tolist(), dest.tolist())]
+            
+    def approaching_mask(self, junction_position, approach_distance=200):
+        """Boolean mask of the vehicles within approach_distance before reaching a junction"""
+        junction_along = int(junction_position[self.axis]) << POS_SHIFT
+        # Signed distance still to travel along the direction of travel
+        delta = self.sign * (junction_along - self._state['pos_along'])
+        return (delta > 0) & (delta < (int(approach_distance) << POS_SHIFT))
             
     def place_vehicle(self, vehicle_type):
         # Validate vehicle placement based on lane configuration
@@ -91,55 +227,69 @@ class Lane:
         if self.side == 'S' and self.lane_number != 1:  # South side: only Lane 2 (moving North)
             return False
             
-        vehicle_length = VEHICLE_TYPES[vehicle_type]['length']
-        base_position = list(self.spawn_point)
-        
-        # Calculate offset based on existing vehicles
-        total_offset = sum([VEHICLE_TYPES[v.type]['length'] + self.spacing for v in self.vehicles])
-        
-        # Adjust position based on direction
-        if self.direction == 'E':  # Left to Right
-            base_position[0] += total_offset
-        elif self.direction == 'W':  # Right to Left
-            base_position[0] -= total_offset
-        elif self.direction == 'S':  # Top to Bottom
-            base_position[1] += total_offset
-        elif self.direction == 'N':  # Bottom to Top
-            base_position[1] -= total_offset
-            
-        vehicle = Vehicle(base_position, self.direction, vehicle_type)
-        self.vehicles.append(vehicle)
+        type_idx = VEHICLE_TYPE_IDX[vehicle_type]
+        length, _, speed = VEHICLE_TABLE[type_idx]
+        min_gap = int(length + self.spacing) << POS_SHIFT
+        
+        # New vehicles queue up along the direction of travel, behind the existing offset
+        pos_along = (int(self.spawn_point[self.axis]) << POS_SHIFT) + self.sign * self._cumulative_offset
+        self._cumulative_offset += min_gap
+        
+        self._state['pos_along'] = np.append(self._state['pos_along'], np.int32(pos_along))
+        self._state['min_gap'] = np.append(self._state['min_gap'], np.int32(min_gap))
+        self._state['step'] = np.append(self._state['step'], np.int32(self.sign * (int(speed) << POS_SHIFT)))
+        self.types = np.append(self.types, np.int8(type_idx))
+        self.vehicle_count += 1
+        self.intersection.vehicle_counts[self.side_idx] += 1
         return True
         
     def update(self, dt, traffic_light_state):
-        for i, vehicle in enumerate(self.vehicles):
-            # Check if there's a vehicle ahead
-            min_distance = VEHICLE_TYPES[vehicle.type]['length'] + self.spacing
-            can_move_forward = True
-            
-            if i > 0:  # If not the first vehicle
-                vehicle_ahead = self.vehicles[i-1]
-                if self.direction in ['E', 'W']:
-                    distance = abs(vehicle_ahead.position[0] - vehicle.position[0])
-                else:  # N, S directions
-                    distance = abs(vehicle_ahead.position[1] - vehicle.position[1])
-                
-                if distance < min_distance:
-                    can_move_forward = False
+        if self.vehicle_count == 0:
+            return
+        pos_along = self._state['pos_along']
             
-            # Only move if light is green and path is clear
-            should_move = traffic_light_state == 'green' and can_move_forward
-            vehicle.update(dt, should_move)
+        # Only move if light is green
+        if traffic_light_state == GREEN:
+            step_vehicles(pos_along, self._state['step'], self._state['min_gap'])
             
-        # Remove vehicles that have moved off screen
-        self.vehicles = [v for v in self.vehicles if not v.is_off_screen()]
+        # Remove vehicles that have moved off screen; the mask is only built on frames
+        # where the furthest-advanced vehicle has actually crossed the bound
+        furthest = pos_along.max() if self.sign > 0 else pos_along.min()
+        if self.sign * furthest > self.off_screen_bound:
+            on_screen = self.sign * pos_along <= self.off_screen_bound
+            self._cumulative_offset -= int(self._state['min_gap'][~on_screen].sum())
+            for key in self._state:
+                self._state[key] = self._state[key][on_screen]
+            self.types = self.types[on_screen]
+            remaining = self.types.size
+            self.intersection.vehicle_counts[self.side_idx] -= self.vehicle_count - remaining
+            self.vehicle_count = remaining
+
+# Green time adjustment per performance bucket (poor, normal, excellent clearance rate)
+PERFORMANCE_ADJUSTMENT = (5, 0, -3)
+
+def performance_bucket(avg_performance):
+    """Classify a clearance rate: 0 = poor (< 0.7), 2 = excellent (> 0.9), 1 otherwise"""
+    if avg_performance < 0.7:
+        return 0
+    elif avg_performance > 0.9:
+        return 2
+    return 1
+
+@lru_cache(maxsize=512)
+def _green_time_lut(vehicle_count, approaching_count, perf_bucket, min_green_time, max_green_time):
+    """Adaptive green time for a density/performance combination (memoized)"""
+    density_factor = min(vehicle_count * 3, 20)  # Cap density factor
+    approach_factor = min(approaching_count * 2, 10)
+    total_time = min_green_time + density_factor + approach_factor + PERFORMANCE_ADJUSTMENT[perf_bucket]
+    return min(max(total_time, min_green_time), max_green_time)
 
 class TrafficLight:
     def __init__(self, position, direction, junction_id):
         self.position = position
         self.direction = direction
         self.junction_id = junction_id
-        self.state = 'red'
+        self.state = RED
         self.timer = 0
         self.min_green_time = 10  # Minimum green time
         self.max_green_time = 45  # Maximum green time
@@ -149,49 +299,38 @@ class TrafficLight:
         self.vehicle_count_last_cycle = 0
         self.vehicles_cleared_last_cycle = 0
         self.performance_history = []  # Track timing effectiveness
+        self._perf_sum = 0.0  # Running totals so the average is O(1) to read
+        self._perf_len = 0
         
     def calculate_green_time(self, vehicle_count, approaching_count=0):
         """Calculate adaptive green time based on vehicle density"""
-        base_time = self.min_green_time
-        
-        # Add time based on current vehicle count
-        density_factor = min(vehicle_count * 3, 20)  # Cap density factor
-        
-        # Consider approaching vehicles for E/W directions
-        if self.direction in ['E', 'W']:
-            approach_factor = min(approaching_count * 2, 10)
-        else:
-            approach_factor = 0
-            
-        # Use historical performance to adjust timing
-        avg_performance = self.get_average_performance()
-        performance_adjustment = self.calculate_performance_adjustment(avg_performance)
-        
-        total_time = base_time + density_factor + approach_factor + performance_adjustment
-        return min(max(total_time, self.min_green_time), self.max_green_time)
+        # Approaching vehicles only count for E/W directions
+        if self.direction not in ['E', 'W']:
+            approaching_count = 0
+        perf_bucket = performance_bucket(self.get_average_performance())
+        return _green_time_lut(vehicle_count, approaching_count, perf_bucket,
+                               self.min_green_time, self.max_green_time)
     
     def get_average_performance(self):
         """Calculate average performance from history"""
-        if not self.performance_history:
+        if not self._perf_len:
             return 1.0
-        return sum(self.performance_history) / len(self.performance_history)
+        return self._perf_sum / self._perf_len
     
     def calculate_performance_adjustment(self, avg_performance):
         """Calculate timing adjustment based on historical performance"""
-        if avg_performance < 0.7:  # Poor clearance rate
-            return 5  # Add more time
-        elif avg_performance > 0.9:  # Excellent clearance rate
-            return -3  # Reduce time
-        return 0
+        return PERFORMANCE_ADJUSTMENT[performance_bucket(avg_performance)]
     
     def update_performance(self, vehicles_cleared, total_vehicles):
         """Update performance metrics after each cycle"""
         if total_vehicles > 0:
             performance = vehicles_cleared / total_vehicles
             self.performance_history.append(performance)
+            self._perf_sum += performance
             # Keep last 5 cycles
             if len(self.performance_history) > 5:
-                self.performance_history.pop(0)
+                self._perf_sum -= self.performance_history.pop(0)
+            self._perf_len = len(self.performance_history)
     
     def start_cycle(self, vehicle_count, approaching_count=0):
         """Start a new traffic light cycle"""
@@ -202,11 +341,11 @@ class TrafficLight:
         self.vehicles_cleared_last_cycle = 0
         
     def update(self, dt, vehicles_present=False, current_vehicle_count=0):
-        if not vehicles_present and self.state != 'red':
+        if not vehicles_present and self.state != RED:
             # Update performance before changing state
             self.update_performance(self.vehicles_cleared_last_cycle,
                                   self.vehicle_count_last_cycle)
-            self.state = 'red'
+            self.state = RED
             self.timer = 0
             self.countdown_active = False
             return
@@ -215,51 +354,48 @@ class TrafficLight:
             self.timer -= dt
             
             # Track cleared vehicles
-            if self.state == 'green':
+            if self.state == GREEN:
                 vehicles_cleared = self.vehicle_count_last_cycle - current_vehicle_count
                 if vehicles_cleared > self.vehicles_cleared_last_cycle:
                     self.vehicles_cleared_last_cycle = vehicles_cleared
             
             if self.timer <= 0:
-                if self.state == 'green':
-                    self.state = 'yellow'
+                if self.state == GREEN:
+                    self.state = YELLOW
                     self.timer = self.yellow_time
-                elif self.state == 'yellow':
-                    self.state = 'red'
+                elif self.state == YELLOW:
+                    self.state = RED
                     self.timer = 0
                     # Update performance at end of cycle
                     self.update_performance(self.vehicles_cleared_last_cycle,
                                          self.vehicle_count_last_cycle)
-    def draw(self, screen):
+    def blit_items(self):
+        """Return (surface, position) pairs for the cached panel and countdown text"""
         x, y = self.position
-        pygame.draw.rect(screen, (50, 50, 50), (x-10, y-30, 20, 60))
-        
-        red_pos = (x, y-20)
-        yellow_pos = (x, y)
-        green_pos = (x, y+20)
-        
-        red_color = (255, 0, 0) if self.state == 'red' else (50, 0, 0)
-        yellow_color = (255, 255, 0) if self.state == 'yellow' else (50, 50, 0)
-        green_color = (0, 255, 0) if self.state == 'green' else (0, 50, 0)
-        
-        pygame.draw.circle(screen, red_color, red_pos, LIGHT_RADIUS)
-        pygame.draw.circle(screen, yellow_color, yellow_pos, LIGHT_RADIUS)
-        pygame.draw.circle(screen, green_color, green_pos, LIGHT_RADIUS)
-        
+        items = [(LIGHT_SURFS[self.state], (x-10, y-30))]
         if self.timer > 0 and self.countdown_active:
-            font = pygame.font.Font(None, 24)
-            timer_text = font.render(f"{int(self.timer)}s", True, (255, 255, 255))
-            screen.blit(timer_text, (x+15, y-10))
+            items.append((timer_text(int(self.timer)), (x+15, y-10)))
+        return items
+        
+    def draw(self, screen):
+        screen.blits(self.blit_items(), doreturn=False)
             
             
 class Intersection:
     def __init__(self, position, id):
         self.position = position
         self.id = id
-        self.lights = {}
-        self.lanes = {}
+        # Both indexed by SIDE_IDX
+        self.lights = [None] * len(SIDE_IDX)
+        self.lanes = [[] for _ in SIDE_IDX]
+        self.vehicle_counts = np.zeros(4, dtype=np.int32)  # Indexed by SIDE_IDX, kept up to date by lanes
         self.setup_lights_and_lanes()
-        self.lane_densities = defaultdict(float)
+        # Flat lane list in side order; each lane carries its own side_idx
+        self.lane_list = [lane for side_lanes in self.lanes for lane in side_lanes]
+        # Lanes grouped per axis, built once for the density and approach helpers
+        self.ew_lanes = tuple(self.lanes[E_IDX]) + tuple(self.lanes[W_IDX])
+        self.ns_lanes = tuple(self.lanes[N_IDX]) + tuple(self.lanes[S_IDX])
+        self.lane_densities = np.zeros((4, 2), dtype=np.float32)  # Indexed by (SIDE_IDX, lane number)
         self.green_time = MIN_GREEN_TIME
         
     def setup_lights_and_lanes(self):
@@ -268,10 +404,9 @@ class Intersection:
             offset_x = config['position_offset'][0] * INTERSECTION_SIZE//2
             offset_y = config['position_offset'][1] * INTERSECTION_SIZE//2
             light_pos = (self.position[0] + offset_x, self.position[1] + offset_y)
-            self.lights[side] = TrafficLight(light_pos, side, self.id)
+            self.lights[SIDE_IDX[side]] = TrafficLight(light_pos, side, self.id)
             
             # Setup lanes for each side
-            self.lanes[side] = []
             for lane_num in range(config['lanes']):
                 lane_offset = LANE_WIDTH * (lane_num - (config['lanes']-1)/2)
                 if side in ['N', 'S']:
@@ -280,17 +415,18 @@ class Intersection:
                 else:
                     lane_pos = (self.position[0] + offset_x * 1.5,
                               self.position[1] + lane_offset)
-                self.lanes[side].append(Lane(self.id, side, lane_num, lane_pos))
+                self.lanes[SIDE_IDX[side]].append(Lane(self.id, side, lane_num, lane_pos, self))
         
     def set_timing(self, green_time):
         self.green_time = max(MIN_GREEN_TIME, min(MAX_GREEN_TIME, green_time))
         
     def update_lights(self, states, cycle_time=None):
         for side, state in states.items():
-            self.lights[side].state = state
-            if cycle_time is not None and state == 'green':
-                self.lights[side].cycle_time = cycle_time
-                self.lights[side].timer = cycle_time
+            light = self.lights[SIDE_IDX[side]]
+            light.state = state
+            if cycle_time is not None and state == GREEN:
+                light.cycle_time = cycle_time
+                light.timer = cycle_time
         
     def draw(self, screen):
         # Draw intersection background
@@ -299,69 +435,71 @@ class Intersection:
                         (x-INTERSECTION_SIZE//2, y-INTERSECTION_SIZE//2,
                          INTERSECTION_SIZE, INTERSECTION_SIZE))
         
-        # Draw traffic lights
-        for light in self.lights.values():
-            light.draw(screen)
-            
-        # Draw lanes and vehicles
-        for side_lanes in self.lanes.values():
-            for lane in side_lanes:
-                # Draw lane marker
-                pygame.draw.circle(screen, (255, 255, 255),
-                                 (int(lane.position[0]), int(lane.position[1])), 3)
-                # Draw all vehicles in the lane
-                for vehicle in lane.vehicles:
-                    vehicle.draw(screen)
-class Vehicle:
-    def __init__(self, position, direction, vehicle_type='Car'):
-        self.position = list(position)
-        self.direction = direction
-        self.type = vehicle_type
-        self.properties = VEHICLE_TYPES[self.type]
-        self.speed = self.properties['speed']
-        self.color = self.properties['color']
-        self.stopped = False
-        self.label = ""
-        
-    def update(self, dt, can_move):
-        if not can_move:
-            return
-            
-        if self.direction == 'E':
-            self.position[0] += self.speed
-        elif self.direction == 'W':
-            self.position[0] -= self.speed
-        elif self.direction == 'S':
-            self.position[1] += self.speed
-        elif self.direction == 'N':
-            self.position[1] -= self.speed
+        # Draw traffic lights from the cached panels in a single batch
+        dirty_rects = screen.blits([item for light in self.lights
+                                    for item in light.blit_items()])
             
-    def is_off_screen(self):
-        return (self.direction == 'E' and self.position[0] > WINDOW_WIDTH + 100) or \
-               (self.direction == 'W' and self.position[0] < -100) or \
-               (self.direction == 'S' and self.position[1] > WINDOW_HEIGHT + 100) or \
-               (self.direction == 'N' and self.position[1] < -100)
+        # Draw lane markers and vehicles with one blit call
+        lane_marker = STATIC_SPRITES['lane_marker']
+        blit_sequence = []
+        for lane in self.lane_list:
+            blit_sequence.append((lane_marker, (int(lane.position[0]) - 3, int(lane.position[1]) - 3)))
+            blit_sequence.extend(lane.blit_items())
+        dirty_rects.extend(screen.blits(blit_sequence))
         
-    def draw(self, screen):
-        x, y = self.position
-        length = self.properties['length']
-        width = self.properties['width']
-        
-        # Draw vehicle with proper orientation
-        if self.direction in ['E', 'W']:
-            rect = pygame.Rect(x - length//2, y - width//2, length, width)
-        else:  # N, S directions
-            rect = pygame.Rect(x - width//2, y - length//2, width, length)
-        pygame.draw.rect(screen, self.color, rect)
-        
-        # Draw label if present
-        if self.label:
-            font = pygame.font.Font(None, 20)
-            text = font.render(self.label, True, (255, 255, 255))
-            text_rect = text.get_rect(center=(x, y - max(width, length) - 10))
-            screen.blit(text, text_rect)
-            
-            
+        # Screen areas that may change from frame to frame
+        return dirty_rects
+
+
+# Static pieces of the timing analysis window
+TIMING_TABLE_HEADER = """
+        <body style='line-height: 1.5'>
+        <table style='width: 100%; border-collapse: collapse;'>
+            <tr style='background-color: #4a4a4a;'>
+                <th style='border: 1px solid #ddd; padding: 8px; text-align: left;'>Junction</th>
+                <th style='border: 1px solid #ddd; padding: 8px; text-align: left;'>Direction</th>
+                <th style='border: 1px solid #ddd; padding: 8px; text-align: left;'>Vehicle Count</th>
+                <th style='border: 1px solid #ddd; padding: 8px; text-align: left;'>Expected Green Time</th>
+                <th style='border: 1px solid #ddd; padding: 8px; text-align: left;'>Current State</th>
+            </tr>
+        """
+
+# Alternating junction row styles
+TIMING_ROW_STYLES = ("style='background-color: #3d3d3d'", "style='background-color: #333333'")
+
+TIMING_ROWS_TEMPLATE = """
+            <tr {row_style}>
+                <td style='border: 1px solid #ddd; padding: 8px;' rowspan='2'>Junction {junction}</td>
+                <td style='border: 1px solid #ddd; padding: 8px;'>East-West</td>
+                <td style='border: 1px solid #ddd; padding: 8px;'>{ew_count} (+{approaching_count} approaching)</td>
+                <td style='border: 1px solid #ddd; padding: 8px;'>{ew_green_time:.1f}s</td>
+                <td style='border: 1px solid #ddd; padding: 8px;'>{ew_state}</td>
+            </tr>
+            <tr {row_style}>
+                <td style='border: 1px solid #ddd; padding: 8px;'>North-South</td>
+                <td style='border: 1px solid #ddd; padding: 8px;'>{ns_count}</td>
+                <td style='border: 1px solid #ddd; padding: 8px;'>{ns_green_time:.1f}s</td>
+                <td style='border: 1px solid #ddd; padding: 8px;'>{ns_state}</td>
+            </tr>
+            """
+
+TIMING_TABLE_FOOTER = """
+        </table>
+        <br><br>
+        <b>Timing Rules:</b><br>
+        • Minimum green time: 10 seconds<br>
+        • Maximum green time: 45 seconds<br>
+        • Yellow time: 3 seconds<br>
+        • Base timing: 3 seconds per vehicle<br>
+        • Additional time for approaching vehicles: 2 seconds per vehicle<br>
+        <br>
+        <b>Coordination Rules:</b><br>
+        • E/W traffic is synchronized between junctions<br>
+        • N/S traffic operates independently at each junction<br>
+        • Green time adapts based on vehicle density<br>
+        </body>
+        """
+
 def calculate_green_time(vehicle_count, is_inter_junction=False):
     """Calculate green time based on vehicle count."""
     if is_inter_junction:
@@ -386,11 +524,40 @@ def is_vehicle_between_junctions(vehicle_position, direction):
         return junction1_x > vehicle_position[0] > junction0_x
     
     return False
+
+
+def count_ew(intersection, next_junction, approach_distance=200):
+    """Count E/W vehicles at a junction and those approaching the next one in a single pass"""
+    count = 0
+    approaching = 0
+    for lane in intersection.ew_lanes:
+        if lane.vehicle_count:
+            count += lane.vehicle_count
+            approaching += np.count_nonzero(lane.approaching_mask(next_junction.position, approach_distance))
+    return count, int(approaching)
+
+
+def compute_densities(intersections, side_counts, approach_distance=200):
+    """Count vehicles per junction straight from the lane arrays.
+    
+    Returns an int array with one row per junction holding the N/S count, the
+    E/W count and the E/W vehicles of the neighbouring junction approaching it.
+    """
+    densities = np.zeros((len(intersections), 3), dtype=np.int32)
+    densities[:, 0] = side_counts[:, N_IDX] + side_counts[:, S_IDX]
+    for intersection in intersections:
+        
+        next_junction = intersections[1 if intersection.id == 0 else 0]
+        ew_count, approaching = count_ew(intersection, next_junction, approach_distance)
+        densities[intersection.id, 1] = ew_count
+        densities[next_junction.id, 2] += approaching
+    return densities
     
     
 class TrafficSystem:
     def __init__(self, manager):
         self.manager = manager
+        load_sprites()
         self.intersections = [
             Intersection((WINDOW_WIDTH//3, WINDOW_HEIGHT//2), 0),
             Intersection((2*WINDOW_WIDTH//3, WINDOW_HEIGHT//2), 1)
@@ -398,7 +565,20 @@ class TrafficSystem:
         self.setup_gui()
         self.simulation_started = False
         self.font = pygame.font.Font(None, 24)
+        # Label text never changes, so render each string once
+        self._label_cache = {text: self.font.render(text, True, (255, 255, 255))
+                             for text in ('Junction 0', 'Junction 1', 'North', 'South', 'East', 'West')}
+        self._label_cache.update((text, self.font.render(text, True, (255, 255, 0)))
+                                 for text in ('Lane 1', 'Lane 2'))
+        self._background = self.render_background()
+        self._label_overlays = [self.composite_labels(intersection)
+                                for intersection in self.intersections]
         self.timing_window = None
+        # Rects drawn last frame (None forces a full-screen update)
+        self.last_dirty_rects = None
+        # E/W vehicles approaching each junction, keyed by junction id; cleared every update
+        self._approach_cache = {}
+        self._control_phase = 0  # Simulation steps since the last control pass
         # To store the timing window reference
         
     def setup_intersections(self):
@@ -408,23 +588,28 @@ class TrafficSystem:
         ]
         
     def setup_gui(self):
+        # Dropdown option -> value lookups used by add_vehicle
+        self._junction_idx = {'Junction 0': 0, 'Junction 1': 1}
+        self._side_idx = {'North': 'N', 'South': 'S', 'East': 'E', 'West': 'W'}
+        self._lane_idx = {'Lane 1': 0, 'Lane 2': 1}
+        
         # Previous GUI elements with adjusted positions
         self.junction_dropdown = pygame_gui.elements.UIDropDownMenu(
-            options_list=['Junction 0', 'Junction 1'],
+            options_list=list(self._junction_idx),
             starting_option='Junction 0',
             relative_rect=pygame.Rect((20, 20), (120, 30)),
             manager=self.manager
         )
         
         self.side_dropdown = pygame_gui.elements.UIDropDownMenu(
-            options_list=['North', 'South', 'East', 'West'],
+            options_list=list(self._side_idx),
             starting_option='North',
             relative_rect=pygame.Rect((150, 20), (100, 30)),
             manager=self.manager
         )
         
         self.lane_dropdown = pygame_gui.elements.UIDropDownMenu(
-            options_list=['Lane 1', 'Lane 2'],
+            options_list=list(self._lane_idx),
             starting_option='Lane 1',
             relative_rect=pygame.Rect((260, 20), (100, 30)),
             manager=self.manager
@@ -481,77 +666,35 @@ class TrafficSystem:
             window_display_title="Traffic Flow Timing Analysis"
         )
 
-        # Calculate current densities and expected timings
-        timing_data = []
-        
-        # Header for the HTML table
-        table_html = """
-        <body style='line-height: 1.5'>
-        <table style='width: 100%; border-collapse: collapse;'>
-            <tr style='background-color: #4a4a4a;'>
-                <th style='border: 1px solid #ddd; padding: 8px; text-align: left;'>Junction</th>
-                <th style='border: 1px solid #ddd; padding: 8px; text-align: left;'>Direction</th>
-                <th style='border: 1px solid #ddd; padding: 8px; text-align: left;'>Vehicle Count</th>
-                <th style='border: 1px solid #ddd; padding: 8px; text-align: left;'>Expected Green Time</th>
-                <th style='border: 1px solid #ddd; padding: 8px; text-align: left;'>Current State</th>
-            </tr>
-        """
+        # Collect HTML fragments and join once at the end
+        parts = [TIMING_TABLE_HEADER]
 
         for i, intersection in enumerate(self.intersections):
             # Calculate EW traffic (including approaching vehicles)
             next_junction = self.intersections[1 if i == 0 else 0]
-            approaching_count = sum(
-                1 for side in ['E', 'W']
-                for lane in intersection.lanes[side]
-                for vehicle in lane.vehicles
-                if self.is_vehicle_approaching_junction(vehicle, next_junction.id)
-            )
-
-            ew_count = sum(len(lane.vehicles) for side in ['E', 'W']
-                          for lane in intersection.lanes[side])
-            ns_count = sum(len(lane.vehicles) for side in ['N', 'S']
-                          for lane in intersection.lanes[side])
+            ew_count, approaching_count = count_ew(intersection, next_junction)
+            ns_count = sum(lane.vehicle_count for lane in intersection.ns_lanes)
 
             # Calculate expected green times
-            ew_green_time = intersection.lights['E'].calculate_green_time(ew_count, approaching_count)
-            ns_green_time = intersection.lights['N'].calculate_green_time(ns_count)
+            ew_green_time = intersection.lights[E_IDX].calculate_green_time(ew_count, approaching_count)
+            ns_green_time = intersection.lights[N_IDX].calculate_green_time(ns_count)
 
             # Add rows for each direction
-            table_html += f"""
-            <tr style='background-color: {'#3d3d3d' if i % 2 == 0 else '#333333'}'>
-                <td style='border: 1px solid #ddd; padding: 8px;' rowspan='2'>Junction {i}</td>
-                <td style='border: 1px solid #ddd; padding: 8px;'>East-West</td>
-                <td style='border: 1px solid #ddd; padding: 8px;'>{ew_count} (+{approaching_count} approaching)</td>
-                <td style='border: 1px solid #ddd; padding: 8px;'>{ew_green_time:.1f}s</td>
-                <td style='border: 1px solid #ddd; padding: 8px;'>{intersection.lights['E'].state.upper()}</td>
-            </tr>
-            <tr style='background-color: {'#3d3d3d' if i % 2 == 0 else '#333333'}'>
-                <td style='border: 1px solid #ddd; padding: 8px;'>North-South</td>
-                <td style='border: 1px solid #ddd; padding: 8px;'>{ns_count}</td>
-                <td style='border: 1px solid #ddd; padding: 8px;'>{ns_green_time:.1f}s</td>
-                <td style='border: 1px solid #ddd; padding: 8px;'>{intersection.lights['N'].state.upper()}</td>
-            </tr>
-            """
+            parts.append(TIMING_ROWS_TEMPLATE.format(
+                row_style=TIMING_ROW_STYLES[i % 2],
+                junction=i,
+                ew_count=ew_count,
+                approaching_count=approaching_count,
+                ew_green_time=ew_green_time,
+                ew_state=LIGHT_STATE_NAMES[intersection.lights[E_IDX].state].upper(),
+                ns_count=ns_count,
+                ns_green_time=ns_green_time,
+                ns_state=LIGHT_STATE_NAMES[intersection.lights[N_IDX].state].upper()
+            ))
 
         # Add timing rules explanation
-        explanation = """
-        </table>
-        <br><br>
-        <b>Timing Rules:</b><br>
-        • Minimum green time: 10 seconds<br>
-        • Maximum green time: 45 seconds<br>
-        • Yellow time: 3 seconds<br>
-        • Base timing: 3 seconds per vehicle<br>
-        • Additional time for approaching vehicles: 2 seconds per vehicle<br>
-        <br>
-        <b>Coordination Rules:</b><br>
-        • E/W traffic is synchronized between junctions<br>
-        • N/S traffic operates independently at each junction<br>
-        • Green time adapts based on vehicle density<br>
-        </body>
-        """
-
-        table_html += explanation
+        parts.append(TIMING_TABLE_FOOTER)
+        table_html = "".join(parts)
 
         # Create text box with timing information
         pygame_gui.elements.UITextBox(
@@ -597,358 +740,344 @@ class TrafficSystem:
                 self.show_timing_info()
             elif event.ui_element == self.reset_button:
                 self.reset_simulation()
+    @staticmethod
+    def _opt(dropdown):
+        """Selected dropdown text (pygame_gui may report it as a (text, id) tuple)"""
+        option = dropdown.selected_option
+        return option[0] if isinstance(option, tuple) else option
+
     def add_vehicle(self):
-        # Get selected values
-        junction_tuple = self.junction_dropdown.selected_option
-        side_tuple = self.side_dropdown.selected_option
-        lane_tuple = self.lane_dropdown.selected_option
-        vehicle_tuple = self.vehicle_dropdown.selected_option
-
-        try:
-            junction_str = junction_tuple[0] if isinstance(junction_tuple, tuple) else junction_tuple
-            junction_idx = int(junction_str.split(' ')[-1])
-            
-            side_str = side_tuple[0] if isinstance(side_tuple, tuple) else side_tuple
-            side = side_str[0].upper()
-            
-            lane_str = lane_tuple[0] if isinstance(lane_tuple, tuple) else lane_tuple
-            lane_idx = int(lane_str.split(' ')[-1]) - 1
-            
-            vehicle_type = vehicle_tuple[0] if isinstance(vehicle_tuple, tuple) else vehicle_tuple
+        # Map selected values through the option lookups built in setup_gui
+        junction_idx = self._junction_idx.get(self._opt(self.junction_dropdown))
+        side = self._side_idx.get(self._opt(self.side_dropdown))
+        lane_idx = self._lane_idx.get(self._opt(self.lane_dropdown))
+        vehicle_type = self._opt(self.vehicle_dropdown)
+
+        if None in (junction_idx, side, lane_idx) or vehicle_type not in VEHICLE_TYPES:
+            self.status_label.set_text("Error adding vehicle")
+            return
             
-            junction = self.intersections[junction_idx]
-            lane = junction.lanes[side][lane_idx]
+        junction = self.intersections[junction_idx]
+        lane = junction.lanes[SIDE_IDX[side]][lane_idx]
+        
+        # Check if the lane allows placement
+        if side == 'E' and lane_idx != 1:
+            self.status_label.set_text("For East side, please select Lane 2")
+            return
+        elif side == 'W' and lane_idx != 0:
+            self.status_label.set_text("For West side, please select Lane 1")
+            return
             
-            # Check if the lane allows placement
-            if side == 'E' and lane_idx != 1:
-                self.status_label.set_text("For East side, please select Lane 2")
-                return
-            elif side == 'W' and lane_idx != 0:
-                self.status_label.set_text("For West side, please select Lane 1")
-                return
-                
-            success = lane.place_vehicle(vehicle_type)
-            if success:
-                vehicle_count = len(lane.vehicles)
-                self.status_label.set_text(
-                    f"Added {vehicle_type} to Junction {junction_idx} {side} Lane {lane_idx+1} "
-                    f"(Vehicles in lane: {vehicle_count})"
-                )
-            else:
-                self.status_label.set_text("Failed to place vehicle - Invalid lane configuration")
-                
-        except Exception as e:
-            print(f"Error adding vehicle: {e}")
-            self.status_label.set_text("Error adding vehicle")
+        success = lane.place_vehicle(vehicle_type)
+        if success:
+            vehicle_count = lane.vehicle_count
+            self.status_label.set_text(
+                f"Added {vehicle_type} to Junction {junction_idx} {side} Lane {lane_idx+1} "
+                f"(Vehicles in lane: {vehicle_count})"
+            )
+        else:
+            self.status_label.set_text("Failed to place vehicle - Invalid lane configuration")
 
     def initialize_traffic_cycle(self):
         for intersection in self.intersections:
-            for side in ['N', 'S', 'E', 'W']:
-                intersection.lights[side].state = 'red'
-                intersection.lights[side].timer = 0
-                intersection.lights[side].countdown_active = False
-
-    def is_vehicle_approaching_junction(self, vehicle, junction_id):
-        """Check if a vehicle is approaching the specified junction."""
-        junction_x = WINDOW_WIDTH//3 if junction_id == 0 else 2*WINDOW_WIDTH//3
-        junction_y = WINDOW_HEIGHT//2
-        vehicle_x, vehicle_y = vehicle.position
-        
-        # Define an approach distance
-        approach_distance = 200
-        
-        if vehicle.direction == 'E':
-            return 0 < (junction_x - vehicle_x) < approach_distance
-        elif vehicle.direction == 'W':
-            return 0 < (vehicle_x - junction_x) < approach_distance
-        elif vehicle.direction == 'S':
-            return 0 < (junction_y - vehicle_y) < approach_distance
-        elif vehicle.direction == 'N':
-            return 0 < (vehicle_y - junction_y) < approach_distance
-        return False
-        
+            for light in intersection.lights:
+                light.state = RED
+                light.timer = 0
+                light.countdown_active = False
+
+    @property
+    def total_vehicles(self):
+        return int(sum(intersection.vehicle_counts.sum() for intersection in self.intersections))
         
     def update(self):
         if not self.simulation_started:
             return
+        self._approach_cache.clear()
 
-        dt = 1/60
+        # Empty scene with every light already red: nothing can change this frame
+        if self.total_vehicles == 0 and all(
+                light.state == RED
+                for intersection in self.intersections
+                for light in intersection.lights):
+            return
 
-        # First calculate total E/W traffic density across both junctions
-        total_ew_density = {
-            'junction0': {
-                'count': sum(len(lane.vehicles) for side in ['E', 'W']
-                           for lane in self.intersections[0].lanes[side]),
-                'approaching': 0
-            },
-            'junction1': {
-                'count': sum(len(lane.vehicles) for side in ['E', 'W']
-                           for lane in self.intersections[1].lanes[side]),
-                'approaching': 0
-            }
-        }
+        dt = SIMULATION_DT
 
-        # Count vehicles approaching each junction
-        for i, intersection in enumerate(self.intersections):
-            next_junction = self.intersections[1 if i == 0 else 0]
-            
-            # Count vehicles moving towards next junction
-            approaching_count = sum(
-                1 for side in ['E', 'W']
-                for lane in intersection.lanes[side]
-                for vehicle in lane.vehicles
-                if self.is_vehicle_approaching_junction(vehicle, next_junction.id)
-            )
-            
-            next_junction_key = f'junction{next_junction.id}'
-            total_ew_density[next_junction_key]['approaching'] = approaching_count
+        # Light decisions only need CONTROL_HZ resolution; vehicles move on every tick
+        if self._control_phase == 0:
+            self.update_control()
+        self._control_phase = (self._control_phase + 1) % CONTROL_INTERVAL
+
+        # Update all lanes
+        for intersection in self.intersections:
+            self.update_vehicles(intersection, dt)
+
+    def update_control(self):
+        """Recount traffic and set every junction's lights for the next control interval"""
+        # Per-side vehicle counts of every junction (rows by junction id), taken once per pass
+        side_counts = np.stack([intersection.vehicle_counts for intersection in self.intersections])
+
+        # N/S, E/W and approaching counts for every junction in one pass
+        densities = compute_densities(self.intersections, side_counts)
+        self._approach_cache.update(enumerate(densities[:, 2].tolist()))
+
+        # Junction 1's E/W load gates Junction 0's E/W lights; read it once for both junctions
+        j1_ew_count = int(side_counts[1, E_IDX] + side_counts[1, W_IDX])
 
         # Now update each intersection
         for intersection in self.intersections:
-            # Calculate local densities for this junction
-            local_densities = {
-                'NS': sum(len(lane.vehicles) for side in ['N', 'S']
-                         for lane in intersection.lanes[side])
-            }
+            ns_count, ew_count, approaching = densities[intersection.id].tolist()
+            ew_total = ew_count + approaching
 
-            junction_key = f'junction{intersection.id}'
-            ew_total = (total_ew_density[junction_key]['count'] +
-                       total_ew_density[junction_key]['approaching'])
+            # No vehicles here and none heading here: all red
+            if ns_count == 0 and ew_total == 0:
+                self.set_all_red(intersection)
+                continue
 
             # Determine if E/W needs to be synchronized
             needs_ew_sync = ew_total > 0
 
             if needs_ew_sync:
                 # Calculate green time based on local density
-                self.coordinate_ew_lights(intersection, ew_total)
+                self.coordinate_ew_lights(intersection, ew_total, j1_ew_count)
                 
                 # NS traffic gets red during E/W coordination
-                self.set_lights_for_axis(intersection, 'NS', 'red')
+                self.set_lights_for_axis(intersection, 'NS', RED)
             else:
                 # No E/W traffic, handle NS traffic independently
-                if local_densities['NS'] > 0:
-                    self.set_lights_for_axis(intersection, 'NS', 'green')
-                    light = intersection.lights['N']  # Use North light for timing
-                    if not light.countdown_active:
-                        light.start_cycle(local_densities['NS'])
-                    self.set_lights_for_axis(intersection, 'EW', 'red')
-                else:
-                    # No traffic in any direction
-                    self.set_lights_for_axis(intersection, 'NS', 'red')
-                    self.set_lights_for_axis(intersection, 'EW', 'red')
-
-            # Update all lanes
-            for side in ['E', 'W', 'N', 'S']:
-                light_state = intersection.lights[side].state
-                for lane in intersection.lanes[side]:
-                    lane.update(dt, light_state)
-    def coordinate_ew_lights(self, intersection, vehicle_count):
+                self.set_lights_for_axis(intersection, 'NS', GREEN, ns_count)
+                light = intersection.lights[N_IDX]  # Use North light for timing
+                if not light.countdown_active:
+                    light.start_cycle(ns_count)
+                self.set_lights_for_axis(intersection, 'EW', RED)
+
+    def coordinate_ew_lights(self, intersection, vehicle_count, junction1_count):
         """Coordinate E/W lights based on vehicle density and junction coordination rules"""
         lights = intersection.lights
         
-        # Get vehicle counts for both junctions
-        junction1_count = sum(len(lane.vehicles) for side in ['E', 'W']
-                             for lane in self.intersections[1].lanes[side])
-        
         # For Junction 0, set state based on Junction 1's vehicle count
         if intersection.id == 0:
             if junction1_count > 3:  # If Junction 1 has more than 3 vehicles
-                for side in ['E', 'W']:
-                    lights[side].state = 'red'
+                for side in EW_SIDES:
+                    lights[side].state = RED
                     lights[side].countdown_active = False
                     lights[side].timer = 0
             else:  # If Junction 1 has 3 or fewer vehicles
-                for side in ['E', 'W']:
-                    lights[side].state = 'green'
+                for side in EW_SIDES:
+                    lights[side].state = GREEN
                     if not lights[side].countdown_active:
                         lights[side].start_cycle(vehicle_count)
         
         # For Junction 1, proceed with normal operation
         elif intersection.id == 1:
             # If lights are already green and counting down, let them continue
-            if lights['E'].state == 'green' and lights['E'].countdown_active:
+            if lights[E_IDX].state == GREEN and lights[E_IDX].countdown_active:
                 return
                 
             # Start new green cycle for E/W
-            for side in ['E', 'W']:
-                lights[side].state = 'green'
+            for side in EW_SIDES:
+                lights[side].state = GREEN
                 if not lights[side].countdown_active:
                     lights[side].start_cycle(vehicle_count)
 
-    def calculate_densities(self, intersection):
-        """Calculate vehicle densities for each direction"""
+    def calculate_densities(self, intersection, counts):
+        """Calculate vehicle densities for each direction from the junction's per-side counts"""
         return {
             'EW': {
-                'count': sum(len(lane.vehicles) for side in ['E', 'W']
-                           for lane in intersection.lanes[side]),
-                'lanes': intersection.lanes['E'] + intersection.lanes['W']
+                'count': int(counts[E_IDX] + counts[W_IDX]),
+                'lanes': intersection.ew_lanes
             },
             'NS': {
-                'count': sum(len(lane.vehicles) for side in ['N', 'S']
-                           for lane in intersection.lanes[side]),
-                'lanes': intersection.lanes['N'] + intersection.lanes['S']
+                'count': int(counts[N_IDX] + counts[S_IDX]),
+                'lanes': intersection.ns_lanes
             }
         }
 
     def count_approaching_vehicles(self, intersection):
-        """Count vehicles approaching from adjacent intersection"""
-        next_junction_id = 1 if intersection.id == 0 else 0
-        return {
-            'EW': sum(
-                1 for side in ['E', 'W']
-                for lane in self.intersections[next_junction_id].lanes[side]
-                for vehicle in lane.vehicles
-                if self.is_vehicle_approaching_junction(vehicle, intersection.id)
-            ),
-            'NS': 0  # N/S traffic doesn't move between junctions
-        }
+        """Count E/W vehicles approaching from adjacent intersection (N/S traffic never does)"""
+        if intersection.id not in self._approach_cache:
+            self._approach_cache[intersection.id] = self._compute_approach(intersection)
+        return self._approach_cache[intersection.id]
+
+    def _compute_approach(self, intersection):
+        next_junction = self.intersections[1 if intersection.id == 0 else 0]
+        return count_ew(next_junction, intersection)[1]
 
     def determine_priority(self, densities, approaching):
-        """Determine which axis should have priority based on density"""
-        ew_score = densities['EW']['count'] + approaching['EW'] * 0.5
-        ns_score = densities['NS']['count']
+        """Determine which axis should have priority based on density.
         
-        if ew_score > ns_score * 1.2:  # 20% threshold for switching
-            return 'EW'
-        elif ns_score > ew_score * 1.2:
-            return 'NS'
-        return None  # Keep current state if difference is small
+        Returns 1 for E/W, -1 for N/S and 0 to keep the current state when the
+        scores are within the 20% switching threshold of each other.
+        """
+        ew_score = densities['EW']['count'] + approaching * 0.5
+        ns_score = densities['NS']['count']
+        return (ew_score > ns_score * 1.2) - (ns_score > ew_score * 1.2)
 
     def update_intersection_lights(self, intersection, densities,
                                 approaching, priority_axis, dt):
         """Update traffic lights based on density and priority"""
-        for axis in ['EW', 'NS']:
-            lights = ['E', 'W'] if axis == 'EW' else ['N', 'S']
+        for axis, lights, axis_priority in (('EW', EW_SIDES, 1), ('NS', NS_SIDES, -1)):
             vehicle_count = densities[axis]['count']
-            approaching_count = approaching[axis]
+            approaching_count = approaching if axis == 'EW' else 0
             
-            # Check if any light in this axis is currently green
-            current_green = any(intersection.lights[side].state == 'green'
-                              for side in lights)
+            # Check if either light in this axis is currently green
+            first, second = lights
+            current_green = (intersection.lights[first].state == GREEN
+                             or intersection.lights[second].state == GREEN)
             
-            if priority_axis == axis and not current_green:
+            if priority_axis == axis_priority and not current_green:
                 # Start new green cycle
                 for side in lights:
                     light = intersection.lights[side]
-                    light.state = 'green'
+                    light.state = GREEN
                     light.start_cycle(vehicle_count, approaching_count)
             
             # Update each light
             for side in lights:
                 light = intersection.lights[side]
-                current_count = sum(len(lane.vehicles)
+                current_count = sum(lane.vehicle_count
                                   for lane in intersection.lanes[side])
                 light.update(dt, vehicle_count > 0, current_count)
 
     def update_vehicles(self, intersection, dt):
-        """Update vehicle movements based on light states"""
-        for side in ['E', 'W', 'N', 'S']:
-            light_state = intersection.lights[side].state
-            for lane in intersection.lanes[side]:
-                lane.update(dt, light_state)
-    def set_lights_for_axis(self, intersection, axis, state):
-        """Set lights for a given axis (EW or NS)"""
+        """Update vehicle movements based on light states; the only place lanes are advanced"""
+        lights = intersection.lights
+        for lane in intersection.lane_list:
+            lane.update(dt, lights[lane.side_idx].state)
+            
+    def set_all_red(self, intersection):
+        """Turn every light of an intersection red, leaving countdown state as it is"""
+        for light in intersection.lights:
+            light.state = RED
+
+    def set_lights_for_axis(self, intersection, axis, state, count=None):
+        """Set lights for a given axis (EW or NS).
+        
+        count is the axis' vehicle count used to start a green cycle; it is only
+        summed from the lanes when turning green without one.
+        """
         if axis == 'EW':
-            intersection.lights['E'].state = state
-            intersection.lights['W'].state = state
+            intersection.lights[E_IDX].state = state
+            intersection.lights[W_IDX].state = state
         else:  # NS
-            intersection.lights['N'].state = state
-            intersection.lights['S'].state = state
+            intersection.lights[N_IDX].state = state
+            intersection.lights[S_IDX].state = state
 
         # Start countdown if turning green
-        if state == 'green':
-            if axis == 'EW':
-                ew_count = sum(len(lane.vehicles) for side in ['E', 'W']
-                             for lane in intersection.lanes[side])
-                for side in ['E', 'W']:
-                    if not intersection.lights[side].countdown_active:
-                        intersection.lights[side].start_cycle(ew_count)
-            else:
-                ns_count = sum(len(lane.vehicles) for side in ['N', 'S']
-                             for lane in intersection.lanes[side])
-                for side in ['N', 'S']:
-                    if not intersection.lights[side].countdown_active:
-                        intersection.lights[side].start_cycle(ns_count)
-    def draw_labels(self, screen):
-        # Draw junction labels
-        for intersection in self.intersections:
-            x, y = intersection.position
-            
-            # Junction number label
-            junction_text = f"Junction {intersection.id}"
-            text_surface = self.font.render(junction_text, True, (255, 255, 255))
-            text_rect = text_surface.get_rect(center=(x, y))
-            screen.blit(text_surface, text_rect)
-            
-            # Side labels
-            sides = {
-                'N': (x, y - INTERSECTION_SIZE//2 - 20, 'North'),
-                'S': (x, y + INTERSECTION_SIZE//2 + 20, 'South'),
-                'E': (x + INTERSECTION_SIZE//2 + 20, y, 'East'),
-                'W': (x - INTERSECTION_SIZE//2 - 20, y, 'West')
-            }
-            
-            for _, (label_x, label_y, side_name) in sides.items():
-                text_surface = self.font.render(side_name, True, (255, 255, 255))
-                text_rect = text_surface.get_rect(center=(label_x, label_y))
-                screen.blit(text_surface, text_rect)
-            
-            # Lane labels
-            lane_offsets = {
-                'E': [(0, -LANE_WIDTH//2, 'Lane 1'), (0, LANE_WIDTH//2, 'Lane 2')],
-                'W': [(0, -LANE_WIDTH//2, 'Lane 1'), (0, LANE_WIDTH//2, 'Lane 2')],
-                'N': [(-LANE_WIDTH//2, 0, 'Lane 1'), (LANE_WIDTH//2, 0, 'Lane 2')],
-                'S': [(-LANE_WIDTH//2, 0, 'Lane 1'), (LANE_WIDTH//2, 0, 'Lane 2')]
-            }
+        if state == GREEN:
+            sides, lanes = ((EW_SIDES, intersection.ew_lanes) if axis == 'EW'
+                            else (NS_SIDES, intersection.ns_lanes))
+            if count is None:
+                count = sum(lane.vehicle_count for lane in lanes)
+            for side in sides:
+                if not intersection.lights[side].countdown_active:
+                    intersection.lights[side].start_cycle(count)
+    def layout_labels(self, intersection):
+        """Place a junction's name, side and lane labels; the junctions never move"""
+        labels = []
+        x, y = intersection.position
+        
+        # Junction number label
+        junction_text = f"Junction {intersection.id}"
+        text_surface = self._label_cache[junction_text]
+        labels.append((text_surface, text_surface.get_rect(center=(x, y))))
+        
+        # Side labels
+        for offset_x, offset_y, side_name in _SIDE_OFFSETS:
+            text_surface = self._label_cache[side_name]
+            labels.append((text_surface, text_surface.get_rect(center=(x + offset_x, y + offset_y))))
+        
+        # Lane labels
+        lane_offsets = {
+            'E': [(0, -LANE_WIDTH//2, 'Lane 1'), (0, LANE_WIDTH//2, 'Lane 2')],
+            'W': [(0, -LANE_WIDTH//2, 'Lane 1'), (0, LANE_WIDTH//2, 'Lane 2')],
+            'N': [(-LANE_WIDTH//2, 0, 'Lane 1'), (LANE_WIDTH//2, 0, 'Lane 2')],
+            'S': [(-LANE_WIDTH//2, 0, 'Lane 1'), (LANE_WIDTH//2, 0, 'Lane 2')]
+        }
+        
+        for side, offsets in lane_offsets.items():
+            base_x = x + (INTERSECTION_SIZE//2 + 60) * (1 if side == 'E' else -1 if side == 'W' else 0)
+            base_y = y + (INTERSECTION_SIZE//2 + 60) * (1 if side == 'S' else -1 if side == 'N' else 0)
             
-            for side, offsets in lane_offsets.items():
-                base_x = x + (INTERSECTION_SIZE//2 + 60) * (1 if side == 'E' else -1 if side == 'W' else 0)
-                base_y = y + (INTERSECTION_SIZE//2 + 60) * (1 if side == 'S' else -1 if side == 'N' else 0)
+            for offset_x, offset_y, lane_name in offsets:
+                if side in ['E', 'W']:
+                    label_x = base_x
+                    label_y = base_y + offset_y
+                else:
+                    label_x = base_x + offset_x
+                    label_y = base_y
                 
-                for offset_x, offset_y, lane_name in offsets:
-                    if side in ['E', 'W']:
-                        label_x = base_x
-                        label_y = base_y + offset_y
-                    else:
-                        label_x = base_x + offset_x
-                        label_y = base_y
-                    
-                    text_surface = self.font.render(lane_name, True, (255, 255, 0))
-                    text_rect = text_surface.get_rect(center=(label_x, label_y))
-                    screen.blit(text_surface, text_rect)
+                text_surface = self._label_cache[lane_name]
+                labels.append((text_surface, text_surface.get_rect(center=(label_x, label_y))))
+        return labels
 
-    def draw(self, screen):
-        screen.fill((34, 139, 34))  # Green background
+    def composite_labels(self, intersection):
+        """Pre-composite a junction's labels into one transparent overlay and its position"""
+        labels = self.layout_labels(intersection)
+        bounds = labels[0][1].unionall([rect for _, rect in labels[1:]])
+        overlay = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        overlay.blits([(surface, rect.move(-bounds.x, -bounds.y)) for surface, rect in labels],
+                      doreturn=False)
+        return overlay, bounds.topleft
+
+    def draw_labels(self, screen):
+        # One pre-composited overlay per junction, built in __init__
+        screen.blits(self._label_overlays, doreturn=False)
+
+    def render_background(self):
+        """Draw the static grass, roads and lane markings into one surface"""
+        background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+        background.fill((34, 139, 34))  # Green background
         
         # Draw roads
         for intersection in self.intersections:
             x, y = intersection.position
             
             # Horizontal road
-            pygame.draw.rect(screen, (50, 50, 50),
+            pygame.draw.rect(background, (50, 50, 50),
                            (0, y - ROAD_WIDTH//2, WINDOW_WIDTH, ROAD_WIDTH))
             
             # Vertical road
-            pygame.draw.rect(screen, (50, 50, 50),
+            pygame.draw.rect(background, (50, 50, 50),
                            (x - ROAD_WIDTH//2, 0, ROAD_WIDTH, WINDOW_HEIGHT))
             
             # Draw lane markings
             for offset in [-ROAD_WIDTH//4, 0, ROAD_WIDTH//4]:
                 # Horizontal lane markings
-                pygame.draw.line(screen, (255, 255, 0),
+                pygame.draw.line(background, (255, 255, 0),
                                (0, y + offset),
                                (WINDOW_WIDTH, y + offset), 2)
                 # Vertical lane markings
-                pygame.draw.line(screen, (255, 255, 0),
+                pygame.draw.line(background, (255, 255, 0),
                                (x + offset, 0),
                                (x + offset, WINDOW_HEIGHT), 2)
+        return background
+
+    def draw(self, screen):
+        # Roads and lane markings never change, so they come from the pre-rendered layer
+        screen.blit(self._background, (0, 0))
         
         # Draw intersections
+        dirty_rects = []
         for intersection in self.intersections:
-            intersection.draw(screen)
+            dirty_rects.extend(intersection.draw(screen))
             
         # Draw all labels
         self.draw_labels(screen)
+        
+        # GUI elements are drawn by the manager afterwards; include their areas too
+        dirty_rects.extend(element.rect for element in self.manager.get_sprite_group().sprites())
+        
+        # Refresh this frame's areas plus last frame's, so moved or removed items get erased;
+        # areas that are unchanged since last frame (stopped vehicles, lights, GUI) are sent once
+        if self.last_dirty_rects is None:
+            update_rects = [screen.get_rect()]
+        else:
+            current = {tuple(rect) for rect in dirty_rects}
+            update_rects = dirty_rects + [rect for rect in self.last_dirty_rects
+                                          if tuple(rect) not in current]
+        self.last_dirty_rects = dirty_rects
+        return update_rects
 
 def main():
     pygame.init()
@@ -959,9 +1088,11 @@ def main():
     
     traffic_system = TrafficSystem(manager)
     
+    sim_accumulator = 0.0
     running = True
     while running:
-        time_delta = clock.tick(60)/1000.0
+        raw_delta = clock.tick(RENDER_FPS)/1000.0
+        time_delta = raw_delta if raw_delta < MAX_FRAME_TIME else MAX_FRAME_TIME
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -971,11 +1102,19 @@ def main():
             traffic_system.handle_event(event)
         
         manager.update(time_delta)
-        traffic_system.update()
-        traffic_system.draw(window_surface)
+        
+        # Advance the simulation by however many fixed steps have elapsed;
+        # the frame-time clamp keeps this to at most two steps per frame
+        sim_accumulator += time_delta
+        while sim_accumulator >= SIMULATION_DT:
+            traffic_system.update()
+            sim_accumulator -= SIMULATION_DT
+            
+        dirty_rects = traffic_system.draw(window_surface)
         manager.draw_ui(window_surface)
         
-        pygame.display.update()
+        # Only push the changed areas to the display
+        pygame.display.update(dirty_rects)
     
     pygame.quit()
 
@@ -1,9 +1,11 @@
 import pygame_gui
 import numpy as np
 import random
-from collections import defaultdict
+import logging
 import pygame
 
+logger = logging.getLogger(__name__)
+
 # Constants
 WINDOW_WIDTH = 1024
 WINDOW_HEIGHT = 768
@@ -19,6 +21,16 @@ MIN_GREEN_TIME = 10
 MAX_GREEN_TIME = 30
 YELLOW_TIME = 3
 
+# Traffic light states
+RED, GREEN, YELLOW = 0, 1, 2
+LIGHT_STATE_NAMES = ('red', 'green', 'yellow')  # Indexed by state, for display
+
+# Vehicle steps are tuned per frame at this rate and scaled by the measured frame time,
+# which is clamped so a stall does not launch vehicles across the screen
+FRAME_RATE = 60
+MAX_FRAME_TIME = 0.05
+MS_TO_S = 1 / 1000  # clock.tick() milliseconds to seconds
+
 # Junction sides configuration
 JUNCTION_SIDES = {
     'N': {'position_offset': (0, -1), 'lanes': 2},
@@ -27,6 +39,30 @@ JUNCTION_SIDES = {
     'W': {'position_offset': (-1, 0), 'lanes': 2}
 }
 
+# Side label offsets from the junction centre: (dx, dy, label)
+_SIDE_OFFSETS = (
+    (0, -INTERSECTION_SIZE//2 - 20, 'North'),
+    (0, INTERSECTION_SIZE//2 + 20, 'South'),
+    (INTERSECTION_SIZE//2 + 20, 0, 'East'),
+    (-INTERSECTION_SIZE//2 - 20, 0, 'West')
+)
+
+# Side indices for the per-side lists and arrays on Intersection
+N_IDX, S_IDX, E_IDX, W_IDX = 0, 1, 2, 3
+SIDE_NAMES = ('N', 'S', 'E', 'W')  # Indexed by side index
+SIDE_IDX = {side: idx for idx, side in enumerate(SIDE_NAMES)}
+# Bit per side for packing the per-side accident flags into one integer
+SIDE_BITS = 1 << np.arange(len(SIDE_NAMES))
+
+# Green axis choices: 0 leaves all sides red, 1 is North/South and 2 is East/West,
+# each as its sides and as their packed side bits
+AXIS_SIDES = ((), (N_IDX, S_IDX), (E_IDX, W_IDX))
+AXIS_BITS = tuple(sum(1 << side_idx for side_idx in sides) for sides in AXIS_SIDES)
+# Light states for every packed mask of green sides
+LIGHT_TABLE = [[GREEN if green_bits & (1 << side_idx) else RED
+                for side_idx in range(len(SIDE_NAMES))]
+               for green_bits in range(1 << len(SIDE_NAMES))]
+
 # Vehicle types with their properties
 VEHICLE_TYPES = {
     'Car': {'length': 40, 'width': 20, 'speed': 3, 'color': (255, 0, 0)},
@@ -35,6 +71,78 @@ VEHICLE_TYPES = {
     'Motorcycle': {'length': 30, 'width': 15, 'speed': 4, 'color': (255, 165, 0)}
 }
 
+# Vehicle type table for the lane arrays: one (length, width, speed) row per type
+VEHICLE_TYPE_NAMES = list(VEHICLE_TYPES.keys())
+VEHICLE_TYPE_IDX = {name: idx for idx, name in enumerate(VEHICLE_TYPE_NAMES)}
+VEHICLE_TABLE = np.array([[props['length'], props['width'], props['speed']]
+                          for props in VEHICLE_TYPES.values()], dtype=np.float32)
+# Integer half length/width per type, for building blit destinations from the lane arrays
+VEHICLE_HALF_SIZE = VEHICLE_TABLE[:, :2].astype(np.int32) // 2
+
+# Direction of travel -> (dx, dy, axis); axis is 0 for x and 1 for y
+DIR_VEC = {'E': (1, 0, 0), 'W': (-1, 0, 0), 'S': (0, 1, 1), 'N': (0, -1, 1)}
+
+# Pre-rendered surfaces for batched blitting, filled by load_sprites() once a display exists
+VEHICLE_SPRITE_ROWS = {'H': [], 'V': []}  # One sprite per type index and orientation
+LIGHT_SURFS = {}
+TEXT_SURFS = {}
+TIMER_DIGITS = {}
+FONTS = {}
+
+def load_sprites():
+    """Pre-render one surface per vehicle type and orientation, the light panels and the fixed texts"""
+    # Rows are indexed by type, so a repeated call must start them afresh
+    for sprite_row in VEHICLE_SPRITE_ROWS.values():
+        sprite_row.clear()
+    for vehicle_type, props in VEHICLE_TYPES.items():
+        sizes = {'H': (props['length'], props['width']), 'V': (props['width'], props['length'])}
+        for orientation, size in sizes.items():
+            surface = pygame.Surface(size).convert()
+            surface.fill(props['color'])
+            VEHICLE_SPRITE_ROWS[orientation].append(surface)
+            
+    # One complete traffic light panel (body plus lit/unlit lamps) per state
+    for state in (RED, YELLOW, GREEN):
+        panel = pygame.Surface((20, 60)).convert()
+        panel.fill((50, 50, 50))
+        red_color = (255, 0, 0) if state == RED else (50, 0, 0)
+        yellow_color = (255, 255, 0) if state == YELLOW else (50, 50, 0)
+        green_color = (0, 255, 0) if state == GREEN else (0, 50, 0)
+        pygame.draw.circle(panel, red_color, (10, 10), LIGHT_RADIUS)
+        pygame.draw.circle(panel, yellow_color, (10, 30), LIGHT_RADIUS)
+        pygame.draw.circle(panel, green_color, (10, 50), LIGHT_RADIUS)
+        LIGHT_SURFS[state] = panel
+        
+    FONTS[20] = pygame.font.Font(None, 20)
+    FONTS[24] = pygame.font.Font(None, 24)
+    TEXT_SURFS['ACCIDENT'] = FONTS[20].render("ACCIDENT", True, (0, 0, 0))
+    # Countdown texts up to the longest green plus yellow phase; timer_text() fills in any others
+    for seconds in range(MAX_GREEN_TIME + YELLOW_TIME + 1):
+        timer_text(seconds)
+
+def timer_text(seconds):
+    """Return the countdown text surface, rendering each value only once"""
+    if seconds not in TIMER_DIGITS:
+        TIMER_DIGITS[seconds] = FONTS[24].render(f"{seconds}s", True, (255, 255, 255))
+    return TIMER_DIGITS[seconds]
+
+def movable_vehicles(pos_along, min_distance):
+    """Mask of one lane's vehicles whose path is clear this frame, without moving them.
+    
+    A vehicle keeps its own length plus spacing from the vehicle placed before
+    it. A lane with an active accident is held by its zero flow rate instead.
+    Every gap is measured on the start-of-frame positions and the whole lane then
+    moves at once, so a follower only sees the room its leader opens on the next
+    frame. This differs from the former one-vehicle-at-a-time update by a few
+    pixels while a queue gets moving.
+    """
+    can_move = np.empty(pos_along.size, dtype=bool)
+    can_move[0] = True
+    gaps = np.diff(pos_along)
+    np.abs(gaps, out=gaps)
+    np.greater_equal(gaps, min_distance[1:], out=can_move[1:])
+    return can_move
+
 class Accident:
     def __init__(self, position, side, lane_number):
         self.position = position
@@ -43,20 +151,20 @@ class Accident:
         self.size = 50  # Size of accident area
         self.active = True
         # Remove automatic clearing since user will manually clear accidents
-        self.flash_timer = 0
-        self.flash_interval = 0.5
+        self.flash_interval = 500  # milliseconds
         self.show_warning = True
-        
-    def update(self, dt):
-        # Update flash effect timer only
-        self.flash_timer += dt
-        if self.flash_timer >= self.flash_interval:
-            self.show_warning = not self.show_warning
-            self.flash_timer = 0
+        # Flash is scheduled against the pygame clock and checked only when drawing
+        self._next_flip = pygame.time.get_ticks() + self.flash_interval
                 
     def draw(self, screen):
+        """Draw the accident area and its label, returning the screen areas touched"""
         if not self.active:
-            return
+            return []
+            
+        now = pygame.time.get_ticks()
+        if now >= self._next_flip:
+            self.show_warning = not self.show_warning
+            self._next_flip = now + self.flash_interval
             
         # Draw accident area with flashing warning
         if self.show_warning:
@@ -68,31 +176,34 @@ class Accident:
         x, y = self.position
         if self.side in ['E', 'W']:
             # Horizontal accident
-            pygame.draw.rect(screen, color,
-                           (x - self.size//2, y - LANE_WIDTH//2,
-                            self.size, LANE_WIDTH))
+            area_rect = pygame.draw.rect(screen, color,
+                                         (x - self.size//2, y - LANE_WIDTH//2,
+                                          self.size, LANE_WIDTH))
         else:
             # Vertical accident
-            pygame.draw.rect(screen, color,
-                           (x - LANE_WIDTH//2, y - self.size//2,
-                            LANE_WIDTH, self.size))
+            area_rect = pygame.draw.rect(screen, color,
+                                         (x - LANE_WIDTH//2, y - self.size//2,
+                                          LANE_WIDTH, self.size))
             
         # Draw "ACCIDENT" text instead of timer
-        font = pygame.font.Font(None, 20)
-        time_text = font.render("ACCIDENT", True, (0, 0, 0))
+        time_text = TEXT_SURFS['ACCIDENT']
         text_rect = time_text.get_rect(center=(x, y))
-        screen.blit(time_text, text_rect)
+        return [area_rect, screen.blit(time_text, text_rect)]
         
 class Lane:
-    def __init__(self, junction_id, side, lane_number, position):
+    def __init__(self, junction_id, side, lane_number, position,
+                 on_count_change=None, on_accident_change=None):
         self.junction_id = junction_id
         self.side = side
+        self.side_idx = SIDE_IDX[side]
         self.lane_number = lane_number
         self.position = position
-        self.vehicles = []
         self.spacing = 5
         self.accident = None
         self.flow_rate_factor = 1.0  # Normal flow rate
+        # Owner callbacks: on_count_change(side_idx, delta) and on_accident_change()
+        self.on_count_change = on_count_change
+        self.on_accident_change = on_accident_change
         
         # Determine direction based on side and lane number
         if side == 'E':
@@ -108,6 +219,61 @@ class Lane:
             self.direction = 'N'  # South side, vehicles move northward
             self.spawn_point = [position[0], WINDOW_HEIGHT - 100]
             
+        # Axis of travel (0 = x, 1 = y) and whether positions grow or shrink along it
+        dx, dy, self.axis = DIR_VEC[self.direction]
+        self.sign = dx + dy
+        
+        # Vehicle state kept as parallel arrays in placement order (Structure-of-Arrays):
+        # position along the axis, length, length plus spacing (the gap each vehicle keeps)
+        # and signed step per frame at full flow
+        self._state = {
+            'pos_along': np.empty(0, dtype=np.float32),
+            'length': np.empty(0, dtype=np.float32),
+            'min_gap': np.empty(0, dtype=np.float32),
+            'step': np.empty(0, dtype=np.float32)
+        }
+        self.types = np.empty(0, dtype=np.int8)
+        # Running total of length plus spacing over the queued vehicles
+        self._occ_len = 0.0
+        self._placed_since_update = False
+        
+        # Vehicles leave the screen once pos_along passes this edge in the direction of travel
+        if self.axis == 0:
+            self.off_screen_edge = WINDOW_WIDTH + 100 if self.sign > 0 else -100
+        else:
+            self.off_screen_edge = WINDOW_HEIGHT + 100 if self.sign > 0 else -100
+        self._past_edge = np.greater if self.sign > 0 else np.less
+        # Furthest position along the direction of travel
+        self._lead = np.max if self.sign > 0 else np.min
+        # Window extent along the axis of travel, for culling
+        self.view_extent = WINDOW_WIDTH if self.axis == 0 else WINDOW_HEIGHT
+        
+    @property
+    def vehicle_count(self):
+        return self._state['pos_along'].size
+        
+    def blit_items(self):
+        """Return (sprite, destination) pairs for the on-screen vehicles, computed from the lane arrays"""
+        pos_along = self._state['pos_along']
+        length = self._state['length']
+        # Sprites start half a length behind the vehicle position along the axis
+        start = pos_along - length // 2
+        visible = (start < self.view_extent) & (start + length > 0)
+        types = self.types[visible]
+        if types.size == 0:
+            return []
+        half_length = VEHICLE_HALF_SIZE[types, 0]
+        half_width = VEHICLE_HALF_SIZE[types, 1]
+        
+        # Top-left corner: along the axis from the position, across it from the lane line
+        dest = np.empty((types.size, 2), dtype=np.int32)
+        dest[:, self.axis] = pos_along[visible].astype(np.int32) - half_length
+        dest[:, 1 - self.axis] = int(self.spawn_point[1 - self.axis]) - half_width
+        
+        sprites = VEHICLE_SPRITE_ROWS['H' if self.axis == 0 else 'V']
+        return [(sprites[type_idx], tuple(topleft))
+                for type_idx, topleft in zip(types.tolist(), dest.tolist())]
+        
     def place_vehicle(self, vehicle_type):
         # Lane 1 (index 0) only accepts vehicles from North/West
         # Lane 2 (index 1) only accepts vehicles from South/East
@@ -119,127 +285,107 @@ class Lane:
         if not allowed:
             return False
             
-        vehicle_length = VEHICLE_TYPES[vehicle_type]['length']
-        base_position = list(self.spawn_point)
-        
-        # Calculate offset based on existing vehicles
-        total_offset = sum([VEHICLE_TYPES[v.type]['length'] + self.spacing for v in self.vehicles])
-        
-        if self.direction == 'E':  # Left to Right
-            base_position[0] += total_offset
-        elif self.direction == 'W':  # Right to Left
-            base_position[0] -= total_offset
-        elif self.direction == 'S':  # Top to Bottom
-            base_position[1] += total_offset
-        elif self.direction == 'N':  # Bottom to Top
-            base_position[1] -= total_offset
-            
-        vehicle = Vehicle(base_position, self.direction, vehicle_type)
-        self.vehicles.append(vehicle)
+        type_idx = VEHICLE_TYPE_IDX[vehicle_type]
+        length, _, speed = VEHICLE_TABLE[type_idx]
+        
+        # New vehicles queue up along the direction of travel, past the existing ones
+        pos_along = self.spawn_point[self.axis] + self.sign * self._occ_len
+        self._occ_len += float(length) + self.spacing
+        
+        self._state['pos_along'] = np.append(self._state['pos_along'], np.float32(pos_along))
+        self._state['length'] = np.append(self._state['length'], length)
+        self._state['min_gap'] = np.append(self._state['min_gap'], length + self.spacing)
+        # Vehicles have always moved by their speed scaled by the lane's effective speed,
+        # so a step at full flow covers speed * speed
+        self._state['step'] = np.append(self._state['step'], np.float32(self.sign * speed * speed))
+        self.types = np.append(self.types, np.int8(type_idx))
+        self._placed_since_update = True
+        if self.on_count_change:
+            self.on_count_change(self.side_idx, 1)
         return True
     
     def place_accident(self, position=None):
         if self.accident and self.accident.active:
             return False  # Already has an active accident
             
-        # If position not provided, calculate a default position
+        # If position not provided, place accident in the middle of the lane,
+        # 100 pixels along the direction of travel
         if position is None:
-            if self.direction in ['E', 'W']:
-                # For horizontal lanes, place accident in the middle of the lane
-                x = self.position[0] + (100 if self.direction == 'E' else -100)
-                y = self.position[1]
-            else:
-                # For vertical lanes, place accident in the middle of the lane
-                x = self.position[0]
-                y = self.position[1] + (100 if self.direction == 'S' else -100)
-            position = (x, y)
+            position = list(self.position)
+            position[self.axis] += self.sign * 100
+            position = tuple(position)
             
         self.accident = Accident(position, self.side, self.lane_number)
         # Reduce flow rate when accident occurs
         self.flow_rate_factor = 0.0  # Stop traffic in this lane only
+        if self.on_accident_change:
+            self.on_accident_change()
         return True
     
     def clear_accident(self):
         if self.accident and self.accident.active:
             self.accident.active = False
             self.flow_rate_factor = 1.0  # Restore normal flow
+            if self.on_accident_change:
+                self.on_accident_change()
             # Note: The traffic light will be updated in the next cycle of determine_traffic_flow_priorities
             return True
         return False
         
-    def update(self, dt, traffic_light_state):
-        # Update accident if present
-        if self.accident and self.accident.active:
-            self.accident.update(dt)
-            
-        for i, vehicle in enumerate(self.vehicles):
-            # Check if there's a vehicle ahead
-            min_distance = VEHICLE_TYPES[vehicle.type]['length'] + self.spacing
-            can_move_forward = True
-            
-            # Check for accident in path - ONLY if the accident is ahead of the vehicle in its direction of travel
-            if self.accident and self.accident.active:
-                # Calculate distance to accident - only consider accidents that are in front of the vehicle
-                if self.direction == 'E' and vehicle.position[0] < self.accident.position[0]:
-                    # Vehicle moving east, accident is ahead (to the right)
-                    accident_distance = self.accident.position[0] - vehicle.position[0]
-                    if accident_distance < min_distance + self.accident.size//2:
-                        can_move_forward = False
-                elif self.direction == 'W' and vehicle.position[0] > self.accident.position[0]:
-                    # Vehicle moving west, accident is ahead (to the left)
-                    accident_distance = vehicle.position[0] - self.accident.position[0]
-                    if accident_distance < min_distance + self.accident.size//2:
-                        can_move_forward = False
-                elif self.direction == 'S' and vehicle.position[1] < self.accident.position[1]:
-                    # Vehicle moving south, accident is ahead (below)
-                    accident_distance = self.accident.position[1] - vehicle.position[1]
-                    if accident_distance < min_distance + self.accident.size//2:
-                        can_move_forward = False
-                elif self.direction == 'N' and vehicle.position[1] > self.accident.position[1]:
-                    # Vehicle moving north, accident is ahead (above)
-                    accident_distance = vehicle.position[1] - self.accident.position[1]
-                    if accident_distance < min_distance + self.accident.size//2:
-                        can_move_forward = False
-            
-            # Check for vehicle ahead
-            if i > 0:  # If not the first vehicle
-                vehicle_ahead = self.vehicles[i-1]
-                if self.direction == 'E':
-                    distance = vehicle_ahead.position[0] - vehicle.position[0]
-                elif self.direction == 'W':
-                    distance = vehicle.position[0] - vehicle_ahead.position[0]
-                elif self.direction == 'S':
-                    distance = vehicle_ahead.position[1] - vehicle.position[1]
-                elif self.direction == 'N':
-                    distance = vehicle.position[1] - vehicle_ahead.position[1]
-                
-                if abs(distance) < min_distance:
-                    can_move_forward = False
+    def prepare(self, dt, traffic_light_state):
+        """Read-only first pass of a frame: the (step, can_move) move plan, or None
+        
+        Only move if light is green, the lane is flowing and the path is clear.
+        """
+        pos_along = self._state['pos_along']
+        if pos_along.size == 0 or traffic_light_state != GREEN or not self.flow_rate_factor:
+            return None
             
-            # Only move if light is green, there's no accident in the lane
-            # or if there is an accident, the vehicle can move (not blocked by accident)
-            should_move = traffic_light_state == 'green' and can_move_forward
+        min_distance = self._state['min_gap']
+        # Frame-time and flow scaling folded into one factor
+        step = self._state['step'] * (dt * FRAME_RATE * self.flow_rate_factor)
+        return step, movable_vehicles(pos_along, min_distance)
+        
+    def advance(self, plan):
+        """Second pass of a frame: apply the move plan from prepare() and drop exited vehicles"""
+        pos_along = self._state['pos_along']
+        if pos_along.size == 0:
+            return
             
-            # If there's an active accident in this lane, the flow rate is already set to 0
-            # so vehicles won't move even if should_move is true
-            effective_speed = VEHICLE_TYPES[vehicle.type]['speed']
-            if self.accident and self.accident.active:
-                effective_speed *= self.flow_rate_factor
-            vehicle.update(dt, should_move, effective_speed)
+        # Lanes that cannot move only need the exit check after a new placement
+        if plan is not None:
+            step, can_move = plan
+            np.add(pos_along, step, out=pos_along, where=can_move)
+        elif not self._placed_since_update:
+            return
+        self._placed_since_update = False
             
         # Remove vehicles that have moved off screen
-        self.vehicles = [v for v in self.vehicles if not v.is_off_screen()]
+        # Only build the removal mask once the lead vehicle has passed the edge
+        if self._past_edge(self._lead(pos_along), self.off_screen_edge):
+            off_screen = self._past_edge(pos_along, self.off_screen_edge)
+            on_screen = ~off_screen
+            removed = int(off_screen.sum())
+            self._occ_len -= float(self._state['min_gap'][off_screen].sum())
+            for key in self._state:
+                self._state[key] = self._state[key][on_screen]
+            self.types = self.types[on_screen]
+            if self.on_count_change:
+                self.on_count_change(self.side_idx, -removed)
     
 
 
     def draw(self, screen):
-        # Draw all vehicles in the lane
-        for vehicle in self.vehicles:
-            vehicle.draw(screen)
+        """Draw the lane's vehicles and accident, returning the screen areas touched"""
+        dirty_rects = []
+        # Draw the lane's on-screen vehicles with one blit call
+        if self.vehicle_count:
+            dirty_rects = screen.blits(self.blit_items())
             
         # Draw accident if active
         if self.accident and self.accident.active:
-            self.accident.draw(screen)
+            dirty_rects.extend(self.accident.draw(screen))
+        return dirty_rects
 
     def has_active_accident(self):
         return self.accident is not None and self.accident.active
@@ -249,7 +395,7 @@ class TrafficLight:
         self.position = position
         self.direction = direction
         self.junction_id = junction_id
-        self.state = 'red'
+        self.state = RED
         self.timer = 0
         self.cycle_time = 0
         self.countdown_active = False
@@ -261,14 +407,14 @@ class TrafficLight:
     
     def update(self, dt, vehicles_present=False, has_accident=False):
         # Don't change state if there's an accident on this direction
-        if has_accident and self.state == 'green':
-            self.state = 'red'
+        if has_accident and self.state == GREEN:
+            self.state = RED
             self.timer = 0
             self.countdown_active = False
             return
             
-        if not vehicles_present and self.state != 'red':
-            self.state = 'red'
+        if not vehicles_present and self.state != RED:
+            self.state = RED
             self.timer = 0
             self.countdown_active = False
             return
@@ -277,56 +423,58 @@ class TrafficLight:
             self.timer -= dt
             
             if self.timer <= 0:
-                if self.state == 'green':
-                    self.state = 'yellow'
+                if self.state == GREEN:
+                    self.state = YELLOW
                     self.timer = YELLOW_TIME
-                elif self.state == 'yellow':
-                    self.state = 'red'
+                elif self.state == YELLOW:
+                    self.state = RED
                     self.timer = 0
             
     def draw(self, screen):
+        """Draw the light and its countdown, returning the screen areas touched"""
         x, y = self.position
-        pygame.draw.rect(screen, (50, 50, 50), (x-10, y-30, 20, 60))
-        
-        red_pos = (x, y-20)
-        yellow_pos = (x, y)
-        green_pos = (x, y+20)
-        
-        red_color = (255, 0, 0) if self.state == 'red' else (50, 0, 0)
-        yellow_color = (255, 255, 0) if self.state == 'yellow' else (50, 50, 0)
-        green_color = (0, 255, 0) if self.state == 'green' else (0, 50, 0)
-        
-        pygame.draw.circle(screen, red_color, red_pos, LIGHT_RADIUS)
-        pygame.draw.circle(screen, yellow_color, yellow_pos, LIGHT_RADIUS)
-        pygame.draw.circle(screen, green_color, green_pos, LIGHT_RADIUS)
+        dirty_rects = [screen.blit(LIGHT_SURFS[self.state], (x-10, y-30))]
         
         if self.timer > 0 and self.countdown_active:
-            font = pygame.font.Font(None, 24)
-            timer_text = font.render(f"{int(self.timer)}s", True, (255, 255, 255))
-            screen.blit(timer_text, (x+15, y-10))
+            dirty_rects.append(screen.blit(timer_text(int(self.timer)), (x+15, y-10)))
+        return dirty_rects
 
 class Intersection:
     def __init__(self, position, id):
         self.position = position
         self.id = id
-        self.lights = {}
-        self.lanes = {}
+        # Lights and lanes per side, indexed by SIDE_IDX
+        self.lights = []
+        self.lanes = []
+        # Per-side vehicle counts and accident flags indexed by SIDE_IDX, kept up to date by the lanes
+        self._side_counts = np.zeros(len(SIDE_NAMES), dtype=np.int32)
+        self._accidents = np.zeros(len(SIDE_NAMES), dtype=bool)
+        self.accident_bits = 0  # The same flags packed with SIDE_BITS
+        self._accident_dirty = True
+        self.densities_dirty = True
+        # Set on any count or accident change; cleared once the light priorities are redone
+        self.priorities_dirty = True
         self.setup_lights_and_lanes()
-        self.lane_densities = defaultdict(float)
+        # All lanes in side order, for the per-frame loops; each lane carries its side_idx
+        self.lane_list = tuple(lane for side_lanes in self.lanes for lane in side_lanes)
+        self._bg, self._bg_topleft = self.render_background()
+        self.lane_densities = np.zeros(len(SIDE_NAMES), dtype=np.float32)
         self.green_time = MIN_GREEN_TIME
         # Track which direction currently has green light
         self.current_green_direction = None
         
     def setup_lights_and_lanes(self):
-        for side, config in JUNCTION_SIDES.items():
+        # Built in SIDE_NAMES order so the lists line up with SIDE_IDX
+        for side in SIDE_NAMES:
+            config = JUNCTION_SIDES[side]
             # Setup traffic lights
             offset_x = config['position_offset'][0] * INTERSECTION_SIZE//2
             offset_y = config['position_offset'][1] * INTERSECTION_SIZE//2
             light_pos = (self.position[0] + offset_x, self.position[1] + offset_y)
-            self.lights[side] = TrafficLight(light_pos, side, self.id)
+            self.lights.append(TrafficLight(light_pos, side, self.id))
             
             # Setup lanes for each side
-            self.lanes[side] = []
+            side_lanes = []
             for lane_num in range(config['lanes']):
                 lane_offset = LANE_WIDTH * (lane_num - (config['lanes']-1)/2)
                 if side in ['N', 'S']:
@@ -335,116 +483,97 @@ class Intersection:
                 else:
                     lane_pos = (self.position[0] + offset_x * 1.5,
                               self.position[1] + lane_offset)
-                self.lanes[side].append(Lane(self.id, side, lane_num, lane_pos))
+                side_lanes.append(Lane(self.id, side, lane_num, lane_pos,
+                                       self._count_changed, self._accident_changed))
+            self.lanes.append(side_lanes)
+        
+    def _count_changed(self, side_idx, delta):
+        self._side_counts[side_idx] += delta
+        self.densities_dirty = True
+        self.priorities_dirty = True
+        
+    def _accident_changed(self):
+        self._accident_dirty = True
+        self.priorities_dirty = True
         
     def set_timing(self, green_time):
         self.green_time = max(MIN_GREEN_TIME, min(MAX_GREEN_TIME, green_time))
         
     def update_lights(self, states, cycle_time=None):
-        for side, state in states.items():
-            self.lights[side].state = state
-            if cycle_time is not None and state == 'green':
-                self.lights[side].cycle_time = cycle_time
-                self.lights[side].timer = cycle_time
+        for side_idx, state in enumerate(states):
+            self.lights[side_idx].state = state
+            if cycle_time is not None and state == GREEN:
+                self.lights[side_idx].cycle_time = cycle_time
+                self.lights[side_idx].timer = cycle_time
                 
                 # Update current green direction
-                if state == 'green':
-                    if side in ['N', 'S']:
+                if state == GREEN:
+                    if side_idx in AXIS_SIDES[1]:
                         self.current_green_direction = 'NS'
                     else:  # side in ['E', 'W']
                         self.current_green_direction = 'EW'
 
     def check_for_accidents(self):
-        accidents = {}
-        for side, lanes in self.lanes.items():
-            accidents[side] = any(lane.has_active_accident() for lane in lanes)
-        return accidents
+        # Only rescan the lanes after an accident was placed or cleared
+        if self._accident_dirty:
+            for side_idx, lanes in enumerate(self.lanes):
+                self._accidents[side_idx] = any(lane.has_active_accident() for lane in lanes)
+            self.accident_bits = int(self._accidents @ SIDE_BITS)
+            self._accident_dirty = False
+        return self._accidents
     
     def count_vehicles(self):
-        vehicle_counts = {}
-        for side, lanes in self.lanes.items():
-            vehicle_counts[side] = sum(len(lane.vehicles) for lane in lanes)
-        return vehicle_counts
+        return self._side_counts
         
-    def draw(self, screen):
-        # Draw intersection background
+    def render_background(self):
+        """Draw the static intersection area and lane markers onto one surface"""
         x, y = self.position
-        pygame.draw.rect(screen, (80, 80, 80),
-                        (x-INTERSECTION_SIZE//2, y-INTERSECTION_SIZE//2,
-                         INTERSECTION_SIZE, INTERSECTION_SIZE))
-        
-        # Draw traffic lights
-        for light in self.lights.values():
-            light.draw(screen)
-            
-        # Draw lanes and vehicles
-        for side, side_lanes in self.lanes.items():
-            for lane in side_lanes:
-                # Draw lane marker
-                pygame.draw.circle(screen, (255, 255, 255),
-                                 (int(lane.position[0]), int(lane.position[1])), 3)
-                # Draw lane contents (vehicles and accidents)
-                lane.draw(screen)
-
-class Vehicle:
-    def __init__(self, position, direction, vehicle_type='Car'):
-        self.position = list(position)
-        self.direction = direction
-        self.type = vehicle_type
-        self.properties = VEHICLE_TYPES[self.type]
-        self.speed = self.properties['speed']
-        self.color = self.properties['color']
-        self.stopped = False
-        self.label = ""  # Will be set by Lane class
-        
-    def update(self, dt, can_move, flow_rate_factor=1.0):
-        if not can_move:
-            return
-            
-        effective_speed = self.speed * flow_rate_factor
-        
-        if self.direction == 'E':
-            self.position[0] += effective_speed
-        elif self.direction == 'W':
-            self.position[0] -= effective_speed
-        elif self.direction == 'S':
-            self.position[1] += effective_speed
-        elif self.direction == 'N':
-            self.position[1] -= effective_speed
-            
-    def is_off_screen(self):
-        return (self.direction == 'E' and self.position[0] > WINDOW_WIDTH + 100) or \
-               (self.direction == 'W' and self.position[0] < -100) or \
-               (self.direction == 'S' and self.position[1] > WINDOW_HEIGHT + 100) or \
-               (self.direction == 'N' and self.position[1] < -100)
+        area = pygame.Rect(x-INTERSECTION_SIZE//2, y-INTERSECTION_SIZE//2,
+                           INTERSECTION_SIZE, INTERSECTION_SIZE)
+        markers = [(int(lane.position[0]), int(lane.position[1]))
+                   for lane in self.lane_list]
+        bounds = area.unionall([pygame.Rect(mx-3, my-3, 7, 7) for mx, my in markers])
+        
+        surface = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        pygame.draw.rect(surface, (80, 80, 80), area.move(-bounds.x, -bounds.y))
+        for mx, my in markers:
+            pygame.draw.circle(surface, (255, 255, 255), (mx - bounds.x, my - bounds.y), 3)
+        return surface, bounds.topleft
         
     def draw(self, screen):
-        x, y = self.position
-        length = self.properties['length']
-        width = self.properties['width']
+        """Draw the intersection, returning the screen areas of its lights, vehicles and accidents"""
+        # Draw intersection background and lane markers
+        screen.blit(self._bg, self._bg_topleft)
         
-        # Draw vehicle
-        if self.direction in ['E', 'W']:
-            rect = pygame.Rect(x - length//2, y - width//2, length, width)
-        else:  # N or S direction
-            rect = pygame.Rect(x - width//2, y - length//2, width, length)
-        pygame.draw.rect(screen, self.color, rect)
-        
-        # Draw label above vehicle (optional, for debugging)
-        font = pygame.font.Font(None, 20)
-        text = font.render(self.label, True, (255, 255, 255))
-        text_rect = text.get_rect(center=(x, y - width - 10))
-        screen.blit(text, text_rect)
-
+        # Draw traffic lights
+        dirty_rects = []
+        for light in self.lights:
+            dirty_rects.extend(light.draw(screen))
+            
+        # Draw lane contents (vehicles and accidents)
+        for lane in self.lane_list:
+            dirty_rects.extend(lane.draw(screen))
+        return dirty_rects
 
 class TrafficSystem:
     def __init__(self, manager):
         self.manager = manager
+        load_sprites()
         # Create a single intersection at the center of the screen
         self.intersection = Intersection((WINDOW_WIDTH//2, WINDOW_HEIGHT//2), 0)
+        self._densities = None
+        # Lanes that received an accident, pruned of cleared ones on each clearing click
+        self._active_accidents = []
         self.setup_gui()
         self.simulation_started = False
         self.font = pygame.font.Font(None, 24)  # Font for labels
+        # Label text never changes, so render each string once
+        self._label_cache = {text: self.font.render(text, True, (255, 255, 255))
+                             for text in ('Traffic Junction', 'North', 'South', 'East', 'West')}
+        self._label_blits = self.layout_labels()
+        self._background = self.render_background()
+        # Rects drawn last frame (None forces a full-screen update)
+        self.last_dirty_rects = None
         self.placing_accident = False
         self.clearing_accident = False
         self.accident_side = None
@@ -550,17 +679,16 @@ class TrafficSystem:
         closest_accident = None
         closest_dist = float('inf')
         
-        for side, lanes in self.intersection.lanes.items():
-            for lane in lanes:
-                if lane.accident and lane.accident.active:
-                    acc_x, acc_y = lane.accident.position
-                    mouse_x, mouse_y = mouse_pos
-                    dist = ((acc_x - mouse_x) ** 2 + (acc_y - mouse_y) ** 2) ** 0.5
-                    
-                    # If mouse is within 30 pixels of the accident center
-                    if dist < 30 and dist < closest_dist:
-                        closest_accident = (side, lane.lane_number, lane)
-                        closest_dist = dist
+        self._active_accidents = [lane for lane in self._active_accidents if lane.has_active_accident()]
+        for lane in self._active_accidents:
+            acc_x, acc_y = lane.accident.position
+            mouse_x, mouse_y = mouse_pos
+            dist_sq = (acc_x - mouse_x) * (acc_x - mouse_x) + (acc_y - mouse_y) * (acc_y - mouse_y)
+            
+            # If mouse is within 30 pixels of the accident center (compared squared)
+            if dist_sq < 900 and dist_sq < closest_dist:
+                closest_accident = (lane.side, lane.lane_number, lane)
+                closest_dist = dist_sq
         
         if closest_accident:
             side, lane_idx, lane = closest_accident
@@ -597,10 +725,12 @@ class TrafficSystem:
             return
             
         try:
-            lane = self.intersection.lanes[self.accident_side][self.accident_lane]
+            lane = self.intersection.lanes[SIDE_IDX[self.accident_side]][self.accident_lane]
             success = lane.place_accident(mouse_pos)
             
             if success:
+                if lane not in self._active_accidents:
+                    self._active_accidents.append(lane)
                 self.status_label.set_text(
                     f"Accident placed on {self.accident_side} Lane {self.accident_lane+1}"
                 )
@@ -631,7 +761,7 @@ class TrafficSystem:
             
             vehicle_type = vehicle_tuple[0] if isinstance(vehicle_tuple, tuple) else vehicle_tuple
             
-            lane = self.intersection.lanes[side][lane_idx]
+            lane = self.intersection.lanes[SIDE_IDX[side]][lane_idx]
             
             # Check lane restrictions based on side
             if side == 'E' and lane_idx != 1:
@@ -649,7 +779,7 @@ class TrafficSystem:
                 
             success = lane.place_vehicle(vehicle_type)
             if success:
-                vehicle_count = len(lane.vehicles)
+                vehicle_count = lane.vehicle_count
                 self.status_label.set_text(
                     f"Added {vehicle_type} to {side_str} Lane {lane_idx+1} "
                     f"(Vehicles in lane: {vehicle_count})"
@@ -667,7 +797,7 @@ class TrafficSystem:
 
     def initialize_traffic_cycle(self):
         # Initially set all lights to red
-        all_red_states = {side: 'red' for side in ['N', 'S', 'E', 'W']}
+        all_red_states = [RED] * len(SIDE_NAMES)
         self.intersection.update_lights(all_red_states)
         
         # Determine which directions should get green lights based on vehicle counts and accidents
@@ -675,151 +805,163 @@ class TrafficSystem:
 
     def calculate_densities(self):
         """Calculate the density of vehicles in each direction."""
-        densities = {}
-        total_vehicles = 0
-        
-        # Count vehicles in each direction
-        for side in ['N', 'S', 'E', 'W']:
-            vehicle_count = sum(len(lane.vehicles) for lane in self.intersection.lanes[side])
-            densities[side] = vehicle_count
-            total_vehicles += vehicle_count
-        
-        # Convert to density ratios if there are vehicles
-        if total_vehicles > 0:
-            for side in densities:
-                densities[side] = densities[side] / total_vehicles
-                
+        # Reuse the last result until a vehicle is added or leaves the screen
+        if not self.intersection.densities_dirty:
+            return self._densities
+            
+        # Density ratios per side, indexed by SIDE_IDX (all zero when there are no vehicles)
+        counts = self.intersection.count_vehicles()
+        densities = counts / max(int(counts.sum()), 1)
+        
+        self._densities = densities
+        self.intersection.densities_dirty = False
         return densities
 
     def determine_traffic_flow_priorities(self):
+        self.intersection.priorities_dirty = False
+        
         # Check for accidents first
         accidents = self.intersection.check_for_accidents()
         
         # Calculate densities
         densities = self.calculate_densities()
         
-        # Initialize all traffic lights to red by default
-        new_states = {side: 'red' for side in ['N', 'S', 'E', 'W']}
-        
         # Find the direction with highest density that doesn't have an accident
-        max_density = 0
-        best_direction = None
-        
-        for side in ['N', 'S', 'E', 'W']:
-            if not accidents[side] and densities.get(side, 0) > max_density:
-                max_density = densities[side]
-                best_direction = side
-        
-        # If we found a suitable direction, give it green light
-        if best_direction is not None:
-            # Determine if this is a North-South or East-West direction
-            if best_direction in ['N', 'S']:
-                # Give green to both North and South if no accidents
-                new_states['N'] = 'green' if not accidents['N'] else 'red'
-                new_states['S'] = 'green' if not accidents['S'] else 'red'
-                # Set green time based on density
-                green_time = MIN_GREEN_TIME + (MAX_GREEN_TIME - MIN_GREEN_TIME) * densities[best_direction]
-                self.intersection.set_timing(green_time)
-            else:  # East or West
-                # Give green to both East and West if no accidents
-                new_states['E'] = 'green' if not accidents['E'] else 'red'
-                new_states['W'] = 'green' if not accidents['W'] else 'red'
-                # Set green time based on density
-                green_time = MIN_GREEN_TIME + (MAX_GREEN_TIME - MIN_GREEN_TIME) * densities[best_direction]
-                self.intersection.set_timing(green_time)
+        candidates = np.where(accidents, 0, densities)
+        best_idx = int(np.argmax(candidates))
+        
+        # Its axis (North-South or East-West) gets green on every side without an
+        # accident; with no suitable direction all lights stay red
+        axis = 0
+        if candidates[best_idx] > 0:
+            axis = 1 if best_idx in AXIS_SIDES[1] else 2
+            # Set green time based on density
+            green_time = MIN_GREEN_TIME + (MAX_GREEN_TIME - MIN_GREEN_TIME) * densities[best_idx]
+            self.intersection.set_timing(green_time)
+        new_states = LIGHT_TABLE[AXIS_BITS[axis] & ~self.intersection.accident_bits]
         
         # Update the traffic lights with the new states
         self.intersection.update_lights(new_states)
         
-        # Debug information
-        print("Traffic light states updated based on density and accidents:")
-        for side in ['N', 'S', 'E', 'W']:
-            accident_status = "ACCIDENT" if accidents[side] else "No accident"
-            density = densities.get(side, 0)
-            print(f"{side}: {new_states[side].upper()} - Density: {density:.2f}, {accident_status}")
+        # Debug information, only built when debug logging is enabled
+        if logger.isEnabledFor(logging.DEBUG):
+            lines = ["Traffic light states updated based on density and accidents:"]
+            for side_idx, side in enumerate(SIDE_NAMES):
+                accident_status = "ACCIDENT" if accidents[side_idx] else "No accident"
+                lines.append(f"{side}: {LIGHT_STATE_NAMES[new_states[side_idx]].upper()} - Density: {densities[side_idx]:.2f}, {accident_status}")
+            logger.debug("\n".join(lines))
 
     
-    def update(self):
+    def update(self, dt):
         if not self.simulation_started:
             return
 
-        dt = 1/60  # Assuming 60 FPS
-        
-        # Determine traffic flow priorities (set lights based on accidents)
-        self.determine_traffic_flow_priorities()
-        
-        # Update lanes and vehicles
-        for side, lanes in self.intersection.lanes.items():
-            for lane in lanes:
-                # Pass the specific light state for this side
-                light_state = self.intersection.lights[side].state
-                lane.update(dt, light_state)
-    def draw_labels(self, screen):
-        # Draw junction label
+        dt = min(dt, MAX_FRAME_TIME)
+        
+        # Determine traffic flow priorities (set lights based on accidents), which only
+        # depend on the vehicle counts and accidents, so only redo them after those change
+        if self.intersection.priorities_dirty:
+            self.determine_traffic_flow_priorities()
+        
+        # Update lanes and vehicles in two passes: plan every lane's moves from the
+        # start-of-frame state, then apply them
+        lanes = self.intersection.lane_list
+        # Read the four light states once, then pass each lane the state for its side
+        light_states = [light.state for light in self.intersection.lights]
+        plans = [lane.prepare(dt, light_states[lane.side_idx]) for lane in lanes]
+        for lane, plan in zip(lanes, plans):
+            lane.advance(plan)
+    def layout_labels(self):
+        """(surface, rect) pairs for the junction and side labels, which never move"""
         x, y = self.intersection.position
         
         # Junction label
         junction_text = "Traffic Junction"
-        text_surface = self.font.render(junction_text, True, (255, 255, 255))
-        text_rect = text_surface.get_rect(center=(x, y))
-        screen.blit(text_surface, text_rect)
+        text_surface = self._label_cache[junction_text]
+        labels = [(text_surface, text_surface.get_rect(center=(x, y)))]
         
         # Side labels
-        sides = {
-            'N': (x, y - INTERSECTION_SIZE//2 - 20, 'North'),
-            'S': (x, y + INTERSECTION_SIZE//2 + 20, 'South'),
-            'E': (x + INTERSECTION_SIZE//2 + 20, y, 'East'),
-            'W': (x - INTERSECTION_SIZE//2 - 20, y, 'West')
-        }
+        for offset_x, offset_y, side_name in _SIDE_OFFSETS:
+            text_surface = self._label_cache[side_name]
+            labels.append((text_surface, text_surface.get_rect(center=(x + offset_x, y + offset_y))))
+        return labels
         
-        for _, (label_x, label_y, side_name) in sides.items():
-            text_surface = self.font.render(side_name, True, (255, 255, 255))
-            text_rect = text_surface.get_rect(center=(label_x, label_y))
-            screen.blit(text_surface, text_rect)
-        
-        # Lane labels
-        lane_offsets = {
-            'E': [(0, -LANE_WIDTH//2, 'Lane 1'), (0, LANE_WIDTH//2, 'Lane 2')],
-            'W': [(0, -LANE_WIDTH//2, 'Lane 1'), (0, LANE_WIDTH//2, 'Lane 2')],
-            'N': [(-LANE_WIDTH//2, 0, 'Lane 1'), (LANE_WIDTH//2, 0, 'Lane 2')],
-            'S': [(-LANE_WIDTH//2, 0, 'Lane 1'), (LANE_WIDTH//2, 0, 'Lane 2')]
-        }
+    def draw_labels(self, screen):
+        # Label positions are laid out once in __init__
+        screen.blits(self._label_blits, doreturn=False)
 
-    def draw(self, screen):
-        screen.fill((34, 139, 34))  # Green background
+    def render_background(self):
+        """Draw the static grass, roads and lane markings into one surface"""
+        background = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+        background.fill((34, 139, 34))  # Green background
         
         # Draw roads
         x, y = self.intersection.position
         
         # Horizontal road
-        pygame.draw.rect(screen, (50, 50, 50),
+        pygame.draw.rect(background, (50, 50, 50),
                       (0, y - ROAD_WIDTH//2, WINDOW_WIDTH, ROAD_WIDTH))
         
         # Vertical road
-        pygame.draw.rect(screen, (50, 50, 50),
+        pygame.draw.rect(background, (50, 50, 50),
                       (x - ROAD_WIDTH//2, 0, ROAD_WIDTH, WINDOW_HEIGHT))
         
         # Draw lane markings
         for offset in [-ROAD_WIDTH//4, 0, ROAD_WIDTH//4]:
             # Horizontal lane markings
-            pygame.draw.line(screen, (255, 255, 0),
+            pygame.draw.line(background, (255, 255, 0),
                           (0, y + offset),
                           (WINDOW_WIDTH, y + offset), 2)
             # Vertical lane markings
-            pygame.draw.line(screen, (255, 255, 0),
+            pygame.draw.line(background, (255, 255, 0),
                           (x + offset, 0),
                           (x + offset, WINDOW_HEIGHT), 2)
+        return background
+
+    def draw(self, screen):
+        # Roads and lane markings never change, so they come from the pre-rendered layer
+        screen.blit(self._background, (0, 0))
         
         # Draw intersection
-        self.intersection.draw(screen)
+        dirty_rects = self.intersection.draw(screen)
             
         # Draw all labels
         self.draw_labels(screen)
+        
+        # GUI elements are drawn by the manager afterwards; include their areas too
+        dirty_rects.extend(element.rect for element in self.manager.get_sprite_group().sprites())
+        
+        # Refresh this frame's areas plus last frame's, so moved or removed items get erased;
+        # areas that are unchanged since last frame (stopped vehicles, lights, GUI) are sent once
+        if self.last_dirty_rects is None:
+            update_rects = [screen.get_rect()]
+        else:
+            current = {tuple(rect) for rect in dirty_rects}
+            update_rects = dirty_rects + [rect for rect in self.last_dirty_rects
+                                          if tuple(rect) not in current]
+        self.last_dirty_rects = dirty_rects
+        return update_rects
 
 def main():
     pygame.init()
     pygame.display.set_caption("Traffic Control Simulation")
-    window_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    # Ask for a vsynced display so frames are presented on the refresh boundary;
+    # fall back to a plain window where the driver cannot provide one
+    try:
+        window_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), vsync=1)
+    except pygame.error:
+        window_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    # Neither the GUI nor the simulation reads joystick, controller or touch input
+    # (SDL still turns touches into mouse events), so keep those out of the queue;
+    # older pygame/SDL builds lack some of these event types, so skip the missing ones
+    unused_events = (
+        'JOYAXISMOTION', 'JOYBALLMOTION', 'JOYHATMOTION', 'JOYBUTTONDOWN', 'JOYBUTTONUP',
+        'CONTROLLERAXISMOTION', 'CONTROLLERBUTTONDOWN', 'CONTROLLERBUTTONUP',
+        'CONTROLLERSENSORUPDATE',
+        'FINGERDOWN', 'FINGERUP', 'FINGERMOTION'
+    )
+    blocked = [getattr(pygame, name, None) for name in unused_events]
+    pygame.event.set_blocked([event_type for event_type in blocked if event_type is not None])
     manager = pygame_gui.UIManager((WINDOW_WIDTH, WINDOW_HEIGHT))
     clock = pygame.time.Clock()
     
@@ -827,7 +969,7 @@ def main():
     
     running = True
     while running:
-        time_delta = clock.tick(60)/1000.0
+        time_delta = clock.tick(FRAME_RATE) * MS_TO_S
         
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -837,11 +979,12 @@ def main():
             traffic_system.handle_event(event)
         
         manager.update(time_delta)
-        traffic_system.update()
-        traffic_system.draw(window_surface)
+        traffic_system.update(time_delta)
+        dirty_rects = traffic_system.draw(window_surface)
         manager.draw_ui(window_surface)
         
-        pygame.display.update()
+        # Only push the changed areas to the display
+        pygame.display.update(dirty_rects)
     
     pygame.quit()
 